@@ -1,11 +1,7 @@
 #!/usr/bin/env python3
-import os
 import logging
 import sys
-from pathlib import Path
-from dotenv import load_dotenv
-from telegram.ext import Application, CommandHandler
-from src.handlers.commands import ping_command, system_command, alert_command, scheduled_task, list_command, remove_command, tokenprice_command, post_init, init_telegram_bot
+from src.core.startup import startup_profile
 
 # Configurar logging
 logging.basicConfig(
@@ -14,51 +10,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Cargar variables de entorno desde config.env
-config_path = Path(__file__).parent.parent / 'config' / 'config.env'
-load_dotenv(config_path)
+# Importar la librería de Telegram y los manejadores (las dependencias pesadas
+# de los manejadores se importan de forma diferida al usarse por primera vez)
+with startup_profile.phase("imports"):
+    from telegram.ext import Application, CommandHandler, MessageHandler, filters
+    from src.handlers.commands import ping_command, system_command, alert_command, scheduled_task, list_command, remove_command, tokenprice_command, import_command, export_command, profile_command, post_init, post_shutdown, init_telegram_bot, reload_config_task, CHECK_JOB_NAME
 
-# Configuración del bot
-TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# Cargar la configuración desde config.env (compartida con TelegramBot y los manejadores)
+with startup_profile.phase("config"):
+    from src.core.config import get_config, CONFIG_POLL_INTERVAL
+    config = get_config()
+
+# Valores con los que arranca el bot. Los manejadores leen get_config(), que se
+# recarga en caliente cuando cambia config/config.env
+TELEGRAM_BOT_TOKEN = config.telegram_bot_token
+TELEGRAM_CHAT_ID = config.telegram_chat_id
 
 # Configuración de criptomonedas
-CRYPTO_CHECK_INTERVAL = int(os.getenv('CRYPTO_CHECK_INTERVAL', '60'))
-CRYPTO_NOTIFICATION_COOLDOWN = int(os.getenv('CRYPTO_NOTIFICATION_COOLDOWN', '3600'))
-CRYPTO_MAX_ALERTS_PER_TOKEN = int(os.getenv('CRYPTO_MAX_ALERTS_PER_TOKEN', '5'))
-CRYPTO_DEFAULT_PRICE_SOURCE = os.getenv('CRYPTO_DEFAULT_PRICE_SOURCE', 'coingecko')
-CRYPTO_EXCHANGE = os.getenv('CRYPTO_EXCHANGE', 'binance')
-CRYPTO_MAX_ALERTS_PER_USER = int(os.getenv('CRYPTO_MAX_ALERTS_PER_USER', '10'))
-CRYPTO_CLEANUP_DAYS = int(os.getenv('CRYPTO_CLEANUP_DAYS', '7'))
-CRYPTO_DEBUG_MODE = os.getenv('CRYPTO_DEBUG_MODE', 'false').lower() == 'true'
+CRYPTO_CHECK_INTERVAL = config.crypto_check_interval
+CRYPTO_NOTIFICATION_COOLDOWN = config.crypto_notification_cooldown
+CRYPTO_MAX_ALERTS_PER_TOKEN = config.crypto_max_alerts_per_token
+CRYPTO_DEFAULT_PRICE_SOURCE = config.crypto_default_price_source
+CRYPTO_EXCHANGE = config.crypto_exchange
+CRYPTO_MAX_ALERTS_PER_USER = config.crypto_max_alerts_per_user
+CRYPTO_CLEANUP_DAYS = config.crypto_cleanup_days
+CRYPTO_DEBUG_MODE = config.crypto_debug_mode
+CRYPTO_WORKERS = config.crypto_workers
+CRYPTO_CHART_CACHE_MB = config.crypto_chart_cache_mb
+CRYPTO_METRICS_INTERVAL = config.crypto_metrics_interval
+CRYPTO_METRICS_HISTORY = config.crypto_metrics_history
+CRYPTO_AUDIT_MAX_MB = config.crypto_audit_max_mb
+CRYPTO_AUDIT_COMPRESS = config.crypto_audit_compress
+CRYPTO_PROFILE_RUNS = config.crypto_profile_runs
+CRYPTO_EVAL_BATCH_SIZE = config.crypto_eval_batch_size
+CRYPTO_MAX_BACKGROUND = config.crypto_max_background
 
 # No hay comandos aquí, se han movido a commands.py
-    
+
 def main() -> None:
     """Inicia el bot y configura los manejadores de comandos"""
-    # Inicializar la instancia de TelegramBot
-    init_telegram_bot()
-    logger.info("Instancia de TelegramBot inicializada")
-    
+    # Garantizar que solo hay un coordinador/notificador en ejecución
+    with startup_profile.phase("leader lock"):
+        from src.core.cluster import LeaderLock
+        leader_lock = LeaderLock()
+        if not leader_lock.acquire():
+            logger.error(f"Ya hay otra instancia del bot en ejecución (bloqueo: {leader_lock.lock_path})")
+            sys.exit(1)
+
+    # Validar la configuración (TelegramBot y la base de datos se crean al usarse)
+    with startup_profile.phase("init"):
+        init_telegram_bot()
+
     # Crear la aplicación y pasarle el token del bot
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).post_init(post_init).build()
+    with startup_profile.phase("application build"):
+        application = Application.builder().token(TELEGRAM_BOT_TOKEN).post_init(post_init).post_shutdown(post_shutdown).build()
 
     # Registrar los manejadores de comandos
-    application.add_handler(CommandHandler("ping", system_command))
-    application.add_handler(CommandHandler("alert", alert_command))
-    application.add_handler(CommandHandler("a", alert_command)) # Alias para /alert
-    application.add_handler(CommandHandler("list", list_command))
-    application.add_handler(CommandHandler("l", list_command))  # Alias para /list
-    application.add_handler(CommandHandler("remove", remove_command))
-    application.add_handler(CommandHandler("r", remove_command)) # Alias para /remove
-    application.add_handler(CommandHandler("info", tokenprice_command))
-    application.add_handler(CommandHandler("i", tokenprice_command)) # Alias para /info
+    with startup_profile.phase("handlers"):
+        application.add_handler(CommandHandler("ping", system_command))
+        application.add_handler(CommandHandler("alert", alert_command))
+        application.add_handler(CommandHandler("a", alert_command)) # Alias para /alert
+        application.add_handler(CommandHandler("list", list_command))
+        application.add_handler(CommandHandler("l", list_command))  # Alias para /list
+        application.add_handler(CommandHandler("remove", remove_command))
+        application.add_handler(CommandHandler("r", remove_command)) # Alias para /remove
+        application.add_handler(CommandHandler("info", tokenprice_command))
+        application.add_handler(CommandHandler("i", tokenprice_command)) # Alias para /info
+        application.add_handler(CommandHandler("import", import_command))
+        application.add_handler(CommandHandler("export", export_command))
+        application.add_handler(CommandHandler("profile", profile_command))
+        # Documentos enviados con /import como pie (CommandHandler solo mira el texto del mensaje)
+        application.add_handler(MessageHandler(filters.Document.ALL & filters.CaptionRegex(r'^/import(@\w+)?\b'), import_command))
 
-    # Configurar la tarea programada (cada X minutos)
-    job_queue = application.job_queue
-    job_queue.run_repeating(scheduled_task, interval=CRYPTO_CHECK_INTERVAL * 60, first=10)
+        # Configurar la tarea programada (cada X minutos)
+        job_queue = application.job_queue
+        job_queue.run_repeating(scheduled_task, interval=CRYPTO_CHECK_INTERVAL * 60, first=10, name=CHECK_JOB_NAME)
+        
+        # Vigilar config/config.env para aplicar los cambios sin reiniciar
+        job_queue.run_repeating(reload_config_task, interval=CONFIG_POLL_INTERVAL, first=CONFIG_POLL_INTERVAL)
 
-    # Iniciar el bot
+    # Iniciar el bot (el perfil de arranque se registra en post_init, justo antes del polling)
     logger.info("Bot iniciado. Presiona Ctrl+C para detener.")
     application.run_polling()
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Importación y exportación de alertas en CSV o JSON
+"""
+
+import io
+import csv
+import json
+import logging
+
+from src.core.database import PRICE_ALERT_TYPES, WINDOW_ALERT_TYPES, EXPRESSION_ALERT_TYPE
+from src.core.expressions import CompiledExpression, ExpressionError
+from src.core.windows import parse_window, format_window
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Columnas de los archivos de importación/exportación
+ALERT_FIELDS = ['token_name', 'alert_type', 'target_price', 'token_contract', 'window', 'expression']
+
+
+def _parse_alert(record, min_window=0):
+    """
+    Valida un registro de alerta importado
+
+    Args:
+        record (dict): Campos del registro (ver ALERT_FIELDS)
+        min_window (int): Duración mínima (segundos) de las ventanas
+
+    Returns:
+        dict: Alerta lista para CryptoDatabase.add_alerts_bulk
+
+    Raises:
+        ValueError: Si el registro no es válido
+    """
+    record = {key: (str(value).strip() if value is not None else '') for key, value in record.items()}
+    alert_type = record.get('alert_type', '').lower()
+
+    if alert_type == EXPRESSION_ALERT_TYPE:
+        try:
+            compiled = CompiledExpression(record.get('expression', ''))
+        except ExpressionError as e:
+            raise ValueError(f"expresión no válida: {e}")
+        return {
+            'token_name': ','.join(sorted(compiled.tokens)),
+            'token_contract': None,
+            'alert_type': alert_type,
+            'target_price': 0,
+            'window_seconds': None,
+            'expression': compiled.source
+        }
+
+    if alert_type not in PRICE_ALERT_TYPES + WINDOW_ALERT_TYPES:
+        raise ValueError(f"tipo de alerta desconocido '{alert_type}'")
+
+    token_name = record.get('token_name', '').upper()
+    if not token_name:
+        raise ValueError("falta token_name")
+
+    try:
+        target_price = float(record.get('target_price', '').rstrip('%'))
+    except ValueError:
+        raise ValueError("target_price debe ser un número")
+    if target_price <= 0:
+        raise ValueError("target_price debe ser mayor que cero")
+
+    window_seconds = None
+    if alert_type in WINDOW_ALERT_TYPES:
+        window_seconds = parse_window(record.get('window', ''))
+        if window_seconds < min_window:
+            raise ValueError(f"la ventana debe ser de al menos {format_window(min_window)}")
+
+    return {
+        'token_name': token_name,
+        'token_contract': record.get('token_contract') or None,
+        'alert_type': alert_type,
+        'target_price': target_price,
+        'window_seconds': window_seconds,
+        'expression': None
+    }
+
+
+def parse_alerts_document(data, filename='', min_window=0):
+    """
+    Lee un documento CSV o JSON con alertas
+
+    El CSV debe tener cabecera con las columnas de ALERT_FIELDS (las que no se
+    usen pueden omitirse). El JSON debe ser una lista de objetos con esas claves.
+
+    Args:
+        data (bytes): Contenido del documento
+        filename (str): Nombre del archivo, para distinguir JSON de CSV
+        min_window (int): Duración mínima (segundos) de las ventanas (ver windows.min_window_seconds)
+
+    Returns:
+        tuple: (alertas válidas, errores). Cada error indica el número de registro
+    """
+    text = data.decode('utf-8-sig')
+    if filename.lower().endswith('.json') or text.lstrip().startswith('['):
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            return [], [f"JSON no válido: {e}"]
+        if not isinstance(records, list):
+            return [], ["El JSON debe ser una lista de alertas"]
+        numbered = enumerate(records, start=1)
+    else:
+        # La línea 1 es la cabecera
+        numbered = enumerate(csv.DictReader(io.StringIO(text)), start=2)
+
+    alerts = []
+    errors = []
+    for number, record in numbered:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("el registro debe ser un objeto")
+            alerts.append(_parse_alert(record, min_window))
+        except ValueError as e:
+            errors.append(f"Registro {number}: {e}")
+    return alerts, errors
+
+
+def _export_record(row):
+    """Convierte una fila de la tabla alerts al formato de exportación"""
+    window_seconds = row['window_seconds']
+    return {
+        'token_name': row['token_name'],
+        'alert_type': row['alert_type'],
+        'target_price': row['target_price'],
+        'token_contract': row['token_contract'] or '',
+        'window': format_window(window_seconds) if window_seconds else '',
+        'expression': row['expression'] or ''
+    }
+
+
+def write_alerts_csv(rows, file):
+    """
+    Escribe las alertas en CSV fila a fila
+
+    Args:
+        rows (iterable): Filas de la tabla alerts (se consumen sin cargarlas todas en memoria)
+        file: Archivo de texto abierto para escritura
+
+    Returns:
+        int: Número de alertas escritas
+    """
+    writer = csv.DictWriter(file, fieldnames=ALERT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(_export_record(row))
+        count += 1
+    return count
+
+
+def write_alerts_json(rows, file):
+    """
+    Escribe las alertas como lista JSON fila a fila
+
+    Returns:
+        int: Número de alertas escritas
+    """
+    count = 0
+    file.write('[')
+    for row in rows:
+        file.write(',\n' if count else '\n')
+        file.write(json.dumps(_export_record(row), ensure_ascii=False))
+        count += 1
+    file.write('\n]\n')
+    return count
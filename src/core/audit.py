@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Registro de auditoría en JSONL de alertas disparadas, errores y notificaciones
+
+Cada evento es una línea JSON con al menos 'ts' (timestamp UNIX) y 'type'
+('trigger', 'fetch_error' o 'notification'). Los eventos se escriben por lotes
+desde un hilo en segundo plano, de modo que registrar un evento solo cuesta
+añadirlo a una cola. Cuando el archivo activo supera el tamaño máximo se rota a
+audit-<fecha>.jsonl, comprimido con gzip si así se configura.
+
+Consulta desde la línea de comandos:
+
+    python -m src.core.audit --since 24h --type trigger
+    python -m src.core.audit --since 2024-05-01 --until 2024-05-02T12:00 --token bitcoin
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import shutil
+import logging
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Directorio por defecto del registro de auditoría
+DEFAULT_AUDIT_DIR = Path(__file__).parent.parent.parent / 'data' / 'audit'
+
+# Nombre del archivo activo y prefijo de los archivos rotados
+ACTIVE_FILE = 'audit.jsonl'
+ROTATED_PREFIX = 'audit-'
+ROTATED_TIME_FORMAT = '%Y%m%d-%H%M%S'
+
+EVENT_TYPES = ('trigger', 'fetch_error', 'notification')
+
+
+class AuditLog:
+    """Escritor asíncrono del registro de auditoría"""
+
+    def __init__(self, audit_dir=DEFAULT_AUDIT_DIR, max_bytes=10 * 1024 * 1024, compress=True,
+                 batch_size=256, flush_interval=1.0, max_pending=10000):
+        """
+        Inicializa el registro
+
+        Args:
+            audit_dir (str): Directorio de los archivos de auditoría
+            max_bytes (int): Tamaño a partir del cual se rota el archivo activo (0 = sin rotación)
+            compress (bool): Comprimir con gzip los archivos rotados
+            batch_size (int): Número máximo de eventos por escritura
+            flush_interval (float): Segundos máximos que un evento espera en la cola
+            max_pending (int): Eventos pendientes a partir de los cuales se descartan los nuevos
+        """
+        self.audit_dir = Path(audit_dir)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._file = None
+
+    @property
+    def active_path(self):
+        return self.audit_dir / ACTIVE_FILE
+
+    def start(self):
+        """Arranca el hilo de escritura"""
+        if self._thread is not None:
+            return
+        os.makedirs(self.audit_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Registro de auditoría en {self.active_path}")
+
+    def record(self, event_type, **fields):
+        """
+        Añade un evento a la cola de escritura sin bloquear
+
+        Args:
+            event_type (str): Tipo de evento (ver EVENT_TYPES)
+            **fields: Datos del evento; deben ser serializables a JSON
+        """
+        event = {'ts': round(time.time(), 3), 'type': event_type}
+        event.update(fields)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Escribe los eventos pendientes y detiene el hilo"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def _run(self):
+        """Bucle del hilo de escritura: agrupa los eventos de la cola en lotes"""
+        running = True
+        while running:
+            try:
+                event = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while event is not None:
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if event is None:
+                running = False
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    logger.error(f"Error al escribir el registro de auditoría: {e}")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, batch):
+        """Escribe un lote de eventos en el archivo activo y lo rota si es necesario"""
+        if self._file is None:
+            self._file = open(self.active_path, 'a', encoding='utf-8')
+        lines = ''.join(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+                        for event in batch)
+        self._file.write(lines)
+        self._file.flush()
+        self.written += len(batch)
+
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Cierra el archivo activo y lo renombra con la fecha de rotación"""
+        self._file.close()
+        self._file = None
+
+        rotated = self.audit_dir / f"{ROTATED_PREFIX}{datetime.now().strftime(ROTATED_TIME_FORMAT)}.jsonl"
+        suffix = 1
+        while rotated.exists() or Path(f"{rotated}.gz").exists():
+            rotated = rotated.with_name(f"{rotated.stem.split('.')[0]}.{suffix}.jsonl")
+            suffix += 1
+        os.replace(self.active_path, rotated)
+
+        if self.compress:
+            with open(rotated, 'rb') as source, gzip.open(f"{rotated}.gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+
+
+def _rotation_key(path):
+    """
+    Momento de rotación y número de secuencia codificados en el nombre de un archivo rotado
+
+    audit-<fecha>.jsonl es el primero rotado en ese segundo; audit-<fecha>.N.jsonl los siguientes.
+    """
+    parts = path.name[len(ROTATED_PREFIX):].split('.')
+    sequence = int(parts[1]) if parts[1].isdigit() else 0
+    return datetime.strptime(parts[0], ROTATED_TIME_FORMAT).timestamp(), sequence
+
+
+def audit_files(audit_dir=DEFAULT_AUDIT_DIR):
+    """
+    Archivos de auditoría en orden cronológico
+
+    Returns:
+        list: Lista de (ruta, inicio, fin); inicio y fin acotan los timestamps del archivo
+              (None si no se conocen)
+    """
+    audit_dir = Path(audit_dir)
+    rotated = []
+    for path in audit_dir.glob(f"{ROTATED_PREFIX}*.jsonl*"):
+        try:
+            rotated.append((_rotation_key(path), path))
+        except (ValueError, IndexError):
+            continue
+    rotated.sort()
+
+    files = []
+    start = None
+    for (end, _), path in rotated:
+        files.append((path, start, end))
+        start = end
+    active = audit_dir / ACTIVE_FILE
+    if active.exists():
+        files.append((active, start, None))
+    return files
+
+
+def read_events(audit_dir=DEFAULT_AUDIT_DIR, since=None, until=None, types=None, token=None):
+    """
+    Recorre los eventos de auditoría de un rango de tiempo
+
+    Los archivos rotados cuyo intervalo queda fuera del rango no se abren.
+
+    Args:
+        audit_dir (str): Directorio de los archivos de auditoría
+        since (float, optional): Timestamp mínimo
+        until (float, optional): Timestamp máximo
+        types (iterable, optional): Tipos de evento a incluir
+        token (str, optional): Solo eventos de este token (sin distinguir mayúsculas)
+
+    Yields:
+        dict: Eventos en orden cronológico
+    """
+    types = set(types) if types else None
+    for path, start, end in audit_files(audit_dir):
+        # Un margen de un segundo cubre el redondeo de la fecha del nombre
+        if since is not None and end is not None and end + 1 < since:
+            continue
+        if until is not None and start is not None and start - 1 > until:
+            break
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8') as audit_file:
+            for line in audit_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Última línea a medias si el bot se detuvo mientras escribía
+                    continue
+                if since is not None and event['ts'] < since:
+                    continue
+                if until is not None and event['ts'] > until:
+                    continue
+                if types is not None and event['type'] not in types:
+                    continue
+                if token is not None and token.upper() not in \
+                        str(event.get('token_name', '')).upper().split(','):
+                    continue
+                yield event
+
+
+def _parse_time(text):
+    """Convierte una fecha ISO o una duración relativa ('30m', '24h', '7d') a timestamp"""
+    from src.core.windows import parse_window
+    try:
+        return time.time() - parse_window(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"'{text}' no es una fecha ISO ni una duración como 24h")
+
+
+def main(argv=None):
+    """Punto de entrada de la consulta por línea de comandos"""
+    parser = argparse.ArgumentParser(description="Consulta el registro de auditoría de alertas")
+    parser.add_argument('--dir', default=str(DEFAULT_AUDIT_DIR), help="Directorio del registro")
+    parser.add_argument('--since', type=_parse_time, help="Desde (fecha ISO o duración como 24h)")
+    parser.add_argument('--until', type=_parse_time, help="Hasta (fecha ISO o duración como 1h)")
+    parser.add_argument('--type', action='append', choices=EVENT_TYPES, dest='types',
+                        help="Tipo de evento (se puede repetir)")
+    parser.add_argument('--token', help="Solo eventos de este token")
+    args = parser.parse_args(argv)
+
+    try:
+        for event in read_events(args.dir, args.since, args.until, args.types, args.token):
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + '\n')
+    except BrokenPipeError:
+        # Salida cortada por head/less
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
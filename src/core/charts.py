@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Gráficas de precios para /info y caché en disco de las imágenes generadas
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Directorio por defecto de la caché de gráficas
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / 'data' / 'charts'
+
+# Pool de procesos para generar las gráficas sin bloquear el bucle de eventos
+_render_pool = None
+
+
+def render_chart(points, title, output_path):
+    """
+    Genera una gráfica PNG con la evolución del precio
+
+    Se ejecuta en un proceso del pool, por eso recibe datos simples y no devuelve nada.
+
+    Args:
+        points (list): Lista de (timestamp 'YYYY-MM-DD HH:MM:SS' en UTC, precio)
+        title (str): Título de la gráfica
+        output_path (str): Ruta del archivo PNG a generar
+    """
+    # Importación diferida: matplotlib solo se carga en el proceso que dibuja
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    times = [datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S') for timestamp, _ in points]
+    prices = [price for _, price in points]
+
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    try:
+        ax.plot(times, prices, color='#f7931a', linewidth=1.5)
+        ax.fill_between(times, prices, min(prices), color='#f7931a', alpha=0.1)
+        ax.set_title(title)
+        ax.set_ylabel('USD')
+        ax.grid(True, alpha=0.3)
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d/%m %H:%M'))
+        fig.autofmt_xdate()
+        fig.tight_layout()
+
+        # Escribir a un archivo temporal y renombrar para no dejar PNG a medias en la caché
+        temp_path = f"{output_path}.tmp"
+        fig.savefig(temp_path, format='png')
+        os.replace(temp_path, output_path)
+    finally:
+        plt.close(fig)
+
+
+def get_render_pool():
+    """Devuelve el pool de procesos de dibujo, creándolo la primera vez que se necesita"""
+    global _render_pool
+    if _render_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _render_pool = ProcessPoolExecutor(max_workers=1)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """Detiene el pool de procesos de dibujo si se ha creado"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False)
+        _render_pool = None
+
+
+class ChartCache:
+    """
+    Caché en disco de gráficas, limitada en tamaño
+
+    Cada gráfica se identifica por (token, rango, timestamp del último dato), de modo
+    que una gráfica deja de usarse en cuanto llega un precio nuevo. También guarda el
+    file_id que devuelve Telegram para reenviar la imagen sin volver a subirla.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=50 * 1024 * 1024):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir (str): Directorio donde se guardan las imágenes
+            max_bytes (int): Tamaño máximo total de las imágenes guardadas
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Una cuenta por petición: acierto si se reenvía el file_id o la imagen ya
+        # estaba en disco, fallo si hay que dibujarla
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # file_id de Telegram por clave, persistido junto a las imágenes
+        self._index_path = self.cache_dir / 'file_ids.json'
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as index_file:
+                self._file_ids = json.load(index_file)
+        except (OSError, ValueError):
+            self._file_ids = {}
+
+    @staticmethod
+    def _key(token_name, range_text, last_timestamp):
+        """Nombre de archivo estable para una clave"""
+        raw = f"{token_name}|{range_text}|{last_timestamp}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, token_name, range_text, last_timestamp):
+        """Ruta del PNG correspondiente a una clave (exista o no)"""
+        return self.cache_dir / f"{self._key(token_name, range_text, last_timestamp)}.png"
+
+    def get_file_id(self, token_name, range_text, last_timestamp):
+        """Devuelve el file_id de Telegram de una gráfica ya enviada, si existe"""
+        return self._file_ids.get(self._key(token_name, range_text, last_timestamp))
+
+    def count_hit(self):
+        """Cuenta como acierto una petición servida con el file_id (get_file_id no cuenta)"""
+        self.hits += 1
+
+    def set_file_id(self, token_name, range_text, last_timestamp, file_id):
+        """Guarda el file_id que Telegram asignó a una gráfica"""
+        self._file_ids[self._key(token_name, range_text, last_timestamp)] = file_id
+        self._save_index()
+
+    def forget_file_id(self, token_name, range_text, last_timestamp):
+        """Olvida un file_id que Telegram ya no acepta"""
+        self._file_ids.pop(self._key(token_name, range_text, last_timestamp), None)
+        self._save_index()
+
+    def get(self, token_name, range_text, last_timestamp):
+        """Devuelve la ruta de la gráfica si ya está generada, o None"""
+        path = self.path_for(token_name, range_text, last_timestamp)
+        if path.exists():
+            self.hits += 1
+            # Actualizar la fecha de modificación para la política LRU
+            os.utime(path)
+            return path
+        self.misses += 1
+        return None
+
+    def evict(self):
+        """Elimina las gráficas usadas hace más tiempo hasta respetar el tamaño máximo"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.png'):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        removed = False
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            self._file_ids.pop(path.stem, None)
+            total -= size
+            removed = True
+        if removed:
+            self._save_index()
+
+    def _save_index(self):
+        """Guarda el índice de file_id de forma atómica"""
+        temp_path = f"{self._index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self._file_ids, index_file)
+        os.replace(temp_path, self._index_path)
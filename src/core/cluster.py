@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Modo multiproceso: reparto de tokens entre procesos worker y bloqueo de coordinador
+"""
+
+import os
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+
+from src.core.evaluator import evaluate_partition, window_store
+from src.core.http_cache import get_http_client, sum_counters
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Los workers se crean con 'spawn': un fork desde el hilo que llama a evaluate() podría
+# copiar un lock tomado por otro hilo (caché HTTP, logging) y bloquear al worker
+WORKER_START_METHOD = 'spawn'
+
+# Segundos entre comprobaciones de si siguen vivos los workers de los que se espera respuesta
+WORKER_POLL_INTERVAL = 1
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class HashRing:
+    """Anillo de hashing consistente para asignar tokens a workers"""
+
+    def __init__(self, nodes, replicas=100):
+        """
+        Inicializa el anillo
+
+        Args:
+            nodes (list): Identificadores de los nodos (workers)
+            replicas (int): Nodos virtuales por nodo para repartir mejor la carga
+        """
+        self._ring = []
+        for node in nodes:
+            for replica in range(replicas):
+                self._ring.append((self._hash(f"{node}:{replica}"), node))
+        self._ring.sort()
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(value):
+        """Hash estable entre procesos (hash() de Python cambia en cada ejecución)"""
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def get_node(self, key):
+        """Devuelve el nodo responsable de una clave"""
+        if not self._ring:
+            raise ValueError("El anillo no tiene nodos")
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    def partition(self, keys):
+        """Agrupa las claves por el nodo responsable de cada una"""
+        partitions = {}
+        for key in keys:
+            partitions.setdefault(self.get_node(key), []).append(key)
+        return partitions
+
+
+class LeaderLock:
+    """Bloqueo de archivo para garantizar un único coordinador/notificador"""
+
+    def __init__(self, lock_path=None):
+        """Inicializa el bloqueo. Por defecto usa data/coordinator.lock"""
+        if lock_path is None:
+            from pathlib import Path
+            lock_path = Path(__file__).parent.parent.parent / 'data' / 'coordinator.lock'
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        self.lock_path = lock_path
+        self._fd = None
+
+    def acquire(self):
+        """
+        Intenta obtener el bloqueo sin esperar
+
+        Se usa lockf (bloqueo POSIX por proceso) para que los procesos hijos (como el
+        pool de gráficas, creado con fork) no hereden el bloqueo y este se libere si el
+        coordinador muere.
+
+        Returns:
+            bool: True si se obtuvo el bloqueo, False si otro proceso lo tiene
+        """
+        if fcntl is None:
+            logger.warning("fcntl no disponible: no se puede garantizar un único coordinador")
+            return True
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        # Guardar el PID del coordinador para facilitar el diagnóstico
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Libera el bloqueo si se tiene"""
+        if self._fd is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def _worker_loop(worker_id, parent_pid, task_queue, result_queue, windows=()):
+    """Bucle principal de un proceso worker"""
+    # Ctrl+C lo gestiona el coordinador, que es quien detiene a los workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Ventanas de los tokens de este worker guardadas en la instantánea
+    window_store.restore(windows)
+
+    while True:
+        try:
+            task = task_queue.get(timeout=5)
+        except queue.Empty:
+            # Salir si el coordinador ha muerto
+            if os.getppid() != parent_pid:
+                break
+            continue
+
+        if task is None:
+            break
+
+        tick_id, tokens = task
+        try:
+            result = evaluate_partition(tokens)
+        except Exception as e:
+            result = {'prices': {}, 'triggered': [],
+                      'errors': [(','.join(tokens), f"⚠️ Error en el worker {worker_id}: {str(e)}")]}
+        # El coordinador guarda las ventanas en la instantánea de estado
+        result['windows'] = window_store.export()
+        # Contadores de la caché HTTP de este worker, para las métricas del coordinador
+        result['http_cache'] = get_http_client().totals()
+        result_queue.put((tick_id, worker_id, result))
+
+
+class WorkerPool:
+    """Conjunto de procesos worker que evalúan cada uno su partición de tokens"""
+
+    def __init__(self, num_workers, timeout=300):
+        """
+        Inicializa el pool
+
+        Args:
+            num_workers (int): Número de procesos worker
+            timeout (int): Segundos máximos de espera por los resultados de un tick
+        """
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.ring = HashRing(range(num_workers))
+        self._context = multiprocessing.get_context(WORKER_START_METHOD)
+        self._processes = []
+        self._task_queues = []
+        self._result_queue = None
+        self._tick_id = 0
+        # Últimas ventanas devueltas por cada worker (o pendientes de enviarle al arrancar)
+        self._windows = {}
+        # Últimos contadores de la caché HTTP de cada worker
+        self._http_totals = {}
+
+    def _spawn(self, worker_id):
+        """Arranca el proceso de un worker con una cola de tareas nueva y sus últimas ventanas"""
+        task_queue = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_loop,
+            args=(worker_id, os.getpid(), task_queue, self._result_queue,
+                  self._windows.get(worker_id, [])),
+            name=f"crypto-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process, task_queue
+
+    def start(self):
+        """Arranca los procesos worker"""
+        self._result_queue = self._context.Queue()
+        for worker_id in range(self.num_workers):
+            process, task_queue = self._spawn(worker_id)
+            self._task_queues.append(task_queue)
+            self._processes.append(process)
+        logger.info(f"{self.num_workers} procesos worker iniciados")
+
+    def _respawn_dead(self):
+        """Vuelve a arrancar los workers que se han detenido (falta de memoria, fallo...)"""
+        for worker_id, process in enumerate(self._processes):
+            if process.is_alive():
+                continue
+            logger.warning(f"El worker {worker_id} se detuvo (código {process.exitcode}); se vuelve a arrancar")
+            # La cola anterior puede tener tareas que ya nadie leerá
+            self._task_queues[worker_id].close()
+            self._processes[worker_id], self._task_queues[worker_id] = self._spawn(worker_id)
+
+    def evaluate(self, tokens):
+        """
+        Reparte los tokens entre los workers y combina sus resultados
+
+        Args:
+            tokens (dict): Nombre del token -> lista de alertas (dict) de ese token
+
+        Returns:
+            dict: Mismo formato que evaluate_partition
+        """
+        if not self._processes:
+            self.start()
+        else:
+            self._respawn_dead()
+
+        self._tick_id += 1
+        tick_id = self._tick_id
+        partitions = self.ring.partition(tokens.keys())
+        for worker_id, token_names in partitions.items():
+            self._task_queues[worker_id].put(
+                (tick_id, {name: tokens[name] for name in token_names}))
+
+        # Los workers sin tokens en este tick no tienen ventanas en uso
+        for worker_id in set(self._windows) - set(partitions):
+            del self._windows[worker_id]
+
+        merged = {'prices': {}, 'triggered': [], 'errors': []}
+        pending = set(partitions.keys())
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result_tick, worker_id, result = self._result_queue.get(
+                    timeout=min(remaining, WORKER_POLL_INTERVAL))
+            except queue.Empty:
+                # No seguir esperando a un worker que se ha detenido durante el tick
+                for worker_id in [worker_id for worker_id in pending
+                                  if not self._processes[worker_id].is_alive()]:
+                    pending.discard(worker_id)
+                    merged['errors'].append((
+                        ','.join(partitions[worker_id]),
+                        f"⚠️ El worker {worker_id} se detuvo antes de responder "
+                        f"({', '.join(partitions[worker_id])})"))
+                continue
+            # Descartar respuestas tardías de ticks anteriores
+            if result_tick != tick_id:
+                continue
+            pending.discard(worker_id)
+            merged['prices'].update(result['prices'])
+            merged['triggered'].extend(result['triggered'])
+            merged['errors'].extend(result['errors'])
+            self._windows[worker_id] = result['windows']
+            self._http_totals[worker_id] = result['http_cache']
+
+        for worker_id in pending:
+            merged['errors'].append((
+                ','.join(partitions[worker_id]),
+                f"⚠️ El worker {worker_id} no respondió a tiempo "
+                f"({', '.join(partitions[worker_id])})"))
+        return merged
+
+    def restore_windows(self, windows):
+        """
+        Asigna las ventanas restauradas al worker responsable de cada token
+
+        Debe llamarse antes de que arranquen los workers, que las reciben al iniciarse.
+
+        Args:
+            windows (list): Ventanas en el formato de WindowStore.export()
+        """
+        if self._processes:
+            raise RuntimeError("Los workers ya están en marcha")
+        self._windows = {}
+        for window in windows:
+            self._windows.setdefault(self.ring.get_node(window[0]), []).append(window)
+
+    def export_windows(self):
+        """Ventanas de todos los workers, según su último resultado, en el formato de WindowStore.export()"""
+        return [window for windows in self._windows.values() for window in windows]
+
+    def http_totals(self):
+        """Suma de los contadores de la caché HTTP de todos los workers"""
+        return sum_counters(self._http_totals.values())
+
+    def queue_sizes(self):
+        """Número aproximado de tareas pendientes de cada worker"""
+        sizes = []
+        for task_queue in self._task_queues:
+            try:
+                sizes.append(task_queue.qsize())
+            except NotImplementedError:  # macOS no implementa qsize
+                sizes.append(0)
+        return sizes
+
+    def shutdown(self):
+        """Detiene los procesos worker"""
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._task_queues = []
+        logger.info("Procesos worker detenidos")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Configuración del bot leída desde config/config.env
+
+El archivo se vigila comparando su fecha de modificación: cuando cambia se crea
+un objeto Config nuevo y se sustituye el compartido de una sola vez, de modo que
+quien haya obtenido la configuración con get_config() siempre ve valores coherentes.
+"""
+
+import os
+import logging
+from pathlib import Path
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto del archivo de configuración
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / 'config' / 'config.env'
+
+# Segundos entre comprobaciones de cambios en el archivo de configuración
+CONFIG_POLL_INTERVAL = 10
+
+# Variables de entorno del proceso: tienen prioridad sobre el archivo, como con load_dotenv
+_PROCESS_ENV = dict(os.environ)
+
+# Valor mínimo de las opciones numéricas: por debajo la configuración no es válida
+CONFIG_MINIMUMS = {
+    'crypto_check_interval': 1,
+    'crypto_notification_cooldown': 0,
+    'crypto_cleanup_days': 1,
+    'crypto_workers': 1,
+    'crypto_chart_cache_mb': 0,
+    'crypto_metrics_interval': 1,
+    'crypto_metrics_history': 1,
+    'crypto_audit_max_mb': 0,
+    'crypto_profile_runs': 0
+}
+
+# Instancia compartida por bot.py, TelegramBot y los manejadores
+_config = None
+_config_mtime = None
+
+
+def _get_bool(values, name, default):
+    """Lee una variable booleana ('true'/'false')"""
+    return values.get(name, default).lower() == 'true'
+
+
+def _file_signature(config_path):
+    """Fecha de modificación y tamaño del archivo, o None si no existe"""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Config:
+    """Valores de configuración del bot"""
+
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
+        """
+        Lee los valores del archivo de configuración y del entorno
+
+        Args:
+            config_path (str): Ruta al archivo config.env
+        """
+        # Importación diferida: python-dotenv solo se necesita al cargar la configuración
+        from dotenv import dotenv_values
+        values = {name: value for name, value in dotenv_values(config_path).items() if value is not None}
+        values.update(_PROCESS_ENV)
+        self.config_path = config_path
+
+        # Configuración de Telegram
+        self.telegram_bot_token = values.get('TELEGRAM_BOT_TOKEN')
+        self.telegram_chat_id = values.get('TELEGRAM_CHAT_ID')
+        self.telegram_parse_mode = values.get('TELEGRAM_PARSE_MODE', 'HTML')
+        self.telegram_disable_web_page_preview = _get_bool(values, 'TELEGRAM_DISABLE_WEB_PAGE_PREVIEW', 'false')
+        self.telegram_disable_notification = _get_bool(values, 'TELEGRAM_DISABLE_NOTIFICATION', 'false')
+
+        # Configuración de criptomonedas
+        self.crypto_check_interval = int(values.get('CRYPTO_CHECK_INTERVAL', '60'))
+        self.crypto_notification_cooldown = int(values.get('CRYPTO_NOTIFICATION_COOLDOWN', '3600'))
+        self.crypto_max_alerts_per_token = int(values.get('CRYPTO_MAX_ALERTS_PER_TOKEN', '5'))
+        self.crypto_default_price_source = values.get('CRYPTO_DEFAULT_PRICE_SOURCE', 'coingecko')
+        self.crypto_exchange = values.get('CRYPTO_EXCHANGE', 'binance')
+        self.crypto_max_alerts_per_user = int(values.get('CRYPTO_MAX_ALERTS_PER_USER', '10'))
+        self.crypto_cleanup_days = int(values.get('CRYPTO_CLEANUP_DAYS', '7'))
+        self.crypto_debug_mode = _get_bool(values, 'CRYPTO_DEBUG_MODE', 'false')
+        self.crypto_workers = int(values.get('CRYPTO_WORKERS', '1'))
+        self.crypto_chart_cache_mb = int(values.get('CRYPTO_CHART_CACHE_MB', '50'))
+        self.crypto_metrics_interval = int(values.get('CRYPTO_METRICS_INTERVAL', '30'))
+        self.crypto_metrics_history = int(values.get('CRYPTO_METRICS_HISTORY', '120'))
+        self.crypto_audit_max_mb = int(values.get('CRYPTO_AUDIT_MAX_MB', '10'))
+        self.crypto_audit_compress = _get_bool(values, 'CRYPTO_AUDIT_COMPRESS', 'true')
+        self.crypto_profile_runs = int(values.get('CRYPTO_PROFILE_RUNS', '0'))
+        # Al menos 1: se usan como tamaño de lote y como límite de concurrencia
+        self.crypto_eval_batch_size = max(1, int(values.get('CRYPTO_EVAL_BATCH_SIZE', '25')))
+        self.crypto_max_background = max(1, int(values.get('CRYPTO_MAX_BACKGROUND', '2')))
+
+        self.validate_ranges()
+
+    def validate_ranges(self):
+        """Comprueba que las opciones numéricas no están por debajo de su mínimo (ver CONFIG_MINIMUMS)"""
+        for name, minimum in CONFIG_MINIMUMS.items():
+            if getattr(self, name) < minimum:
+                raise ValueError(
+                    f"{name.upper()} debe ser mayor o igual que {minimum} (valor: {getattr(self, name)})")
+
+    def validate_telegram(self):
+        """Comprueba que el token y el chat de Telegram están configurados"""
+        if not self.telegram_bot_token or self.telegram_bot_token == "tu_token_del_bot_aqui":
+            raise ValueError(
+                "TELEGRAM_BOT_TOKEN no está configurado correctamente")
+
+        if not self.telegram_chat_id or self.telegram_chat_id == "tu_chat_id_aqui":
+            raise ValueError(
+                "TELEGRAM_CHAT_ID no está configurado correctamente")
+
+
+    def diff(self, other):
+        """
+        Compara con otra configuración
+
+        Returns:
+            dict: Atributo -> (valor actual, valor de la otra) de los que cambian
+        """
+        return {name: (value, getattr(other, name, None))
+                for name, value in vars(self).items()
+                if getattr(other, name, None) != value}
+
+
+def get_config():
+    """Devuelve la configuración compartida, cargándola la primera vez"""
+    global _config, _config_mtime
+    if _config is None:
+        _config_mtime = _file_signature(DEFAULT_CONFIG_PATH)
+        _config = Config()
+        logger.info(f"Configuración cargada desde {_config.config_path}")
+    return _config
+
+
+def reload_config_if_changed():
+    """
+    Vuelve a cargar la configuración si el archivo ha cambiado
+
+    Si el archivo nuevo no es válido se mantiene la configuración actual.
+
+    Returns:
+        dict: Atributo -> (valor anterior, valor nuevo) de los que han cambiado
+    """
+    global _config, _config_mtime
+    current = get_config()
+    signature = _file_signature(current.config_path)
+    if signature is None or signature == _config_mtime:
+        return {}
+    _config_mtime = signature
+
+    try:
+        new_config = Config(current.config_path)
+        new_config.validate_telegram()
+    except ValueError as e:
+        logger.error(f"Configuración nueva descartada: {e}")
+        return {}
+
+    changes = current.diff(new_config)
+    _config = new_config
+    if changes:
+        logger.info(f"Configuración recargada, cambios: {', '.join(sorted(changes))}")
+    return changes
@@ -7,6 +7,15 @@ from datetime import datetime
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Alertas de precio fijo: el precio supera o baja de target_price
+PRICE_ALERT_TYPES = ('above', 'below')
+
+# Alertas de variación: el precio sube, baja o se mueve target_price % en window_seconds
+WINDOW_ALERT_TYPES = ('up', 'down', 'move')
+
+# Alertas compuestas: expresión booleana sobre varios tokens (columna expression)
+EXPRESSION_ALERT_TYPE = 'expression'
+
 class CryptoDatabase:
     """Clase para gestionar la base de datos de alertas de criptomonedas"""
     
@@ -46,15 +55,26 @@ class CryptoDatabase:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 token_name TEXT NOT NULL,
                 token_contract TEXT,
-                alert_type TEXT NOT NULL,  -- 'above' o 'below'
-                target_price REAL NOT NULL,
+                alert_type TEXT NOT NULL,  -- 'above', 'below', 'up', 'down', 'move' o 'expression'
+                target_price REAL NOT NULL,  -- Precio, o porcentaje en las alertas de variación
                 is_active BOOLEAN DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 last_triggered TIMESTAMP,
-                trigger_count INTEGER DEFAULT 0
+                trigger_count INTEGER DEFAULT 0,
+                window_seconds INTEGER,  -- Ventana de las alertas de variación
+                expression TEXT  -- Expresión de las alertas compuestas
             )
             ''')
             
+            # Migrar bases de datos creadas antes de las alertas de variación y compuestas
+            self._add_column_if_missing('alerts', 'window_seconds', 'INTEGER')
+            self._add_column_if_missing('alerts', 'expression', 'TEXT')
+            
+            # Índice para contar y obtener las alertas activas sin recorrer toda la tabla
+            self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts (is_active)
+            ''')
+            
             # Tabla para historial de precios
             self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS price_history (
@@ -65,24 +85,41 @@ class CryptoDatabase:
             )
             ''')
             
+            # Índice para consultar el historial de un token por rango de fechas (/info <token> <rango>)
+            self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_price_history_token_timestamp
+            ON price_history (token_name, timestamp)
+            ''')
+            
             self.conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Error al crear las tablas: {e}")
             self.conn.rollback()
             raise
     
-    def add_alert(self, token_name, alert_type, target_price, token_contract=None):
+    def _add_column_if_missing(self, table, column, column_type):
+        """Añade una columna a una tabla existente si todavía no la tiene"""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row['name'] for row in self.cursor.fetchall()]:
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            logger.info(f"Columna {column} añadida a la tabla {table}")
+    
+    def add_alert(self, token_name, alert_type, target_price, token_contract=None, window_seconds=None):
         """Añade una nueva alerta a la base de datos"""
         try:
             # Validar el tipo de alerta
-            if alert_type not in ['above', 'below']:
-                raise ValueError("El tipo de alerta debe ser 'above' o 'below'")
+            if alert_type not in PRICE_ALERT_TYPES + WINDOW_ALERT_TYPES:
+                raise ValueError("El tipo de alerta debe ser 'above', 'below', 'up', 'down' o 'move'")
+            if alert_type in WINDOW_ALERT_TYPES and not window_seconds:
+                raise ValueError("Las alertas de variación necesitan una ventana de tiempo")
+            if alert_type in PRICE_ALERT_TYPES:
+                window_seconds = None
             
             # Insertar la alerta
             self.cursor.execute('''
-            INSERT INTO alerts (token_name, token_contract, alert_type, target_price)
-            VALUES (?, ?, ?, ?)
-            ''', (token_name.upper(), token_contract, alert_type, target_price))
+            INSERT INTO alerts (token_name, token_contract, alert_type, target_price, window_seconds)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (token_name.upper(), token_contract, alert_type, target_price, window_seconds))
             
             alert_id = self.cursor.lastrowid
             self.conn.commit()
@@ -94,6 +131,96 @@ class CryptoDatabase:
             self.conn.rollback()
             raise
     
+    def add_expression_alert(self, expression, token_names):
+        """
+        Añade una alerta compuesta a la base de datos
+
+        Args:
+            expression (str): Expresión normalizada (por ejemplo "ETH < 2500 AND BTC > 60000")
+            token_names (iterable): Tokens de los que depende la expresión
+        """
+        try:
+            # token_name guarda los tokens de la expresión; target_price no se usa
+            self.cursor.execute('''
+            INSERT INTO alerts (token_name, alert_type, target_price, expression)
+            VALUES (?, ?, 0, ?)
+            ''', (','.join(sorted(token_names)), EXPRESSION_ALERT_TYPE, expression))
+            
+            alert_id = self.cursor.lastrowid
+            self.conn.commit()
+            
+            logger.info(f"Alerta compuesta creada: {expression}")
+            return alert_id
+        except sqlite3.Error as e:
+            logger.error(f"Error al añadir alerta compuesta: {e}")
+            self.conn.rollback()
+            raise
+    
+    def add_alerts_bulk(self, alerts, max_alerts_per_token):
+        """
+        Añade muchas alertas en una sola transacción
+
+        El límite de alertas por token se comprueba con una única consulta
+        agrupada en lugar de consultar cada token por separado.
+
+        Args:
+            alerts (list): Alertas validadas (token_name, token_contract, alert_type,
+                           target_price, window_seconds, expression)
+            max_alerts_per_token (int): Máximo de alertas activas por token
+
+        Returns:
+            tuple: (número de alertas añadidas, alertas rechazadas por el límite)
+        """
+        try:
+            self.cursor.execute('''
+            SELECT token_name, COUNT(*) AS total FROM alerts
+            WHERE is_active = 1 AND alert_type != ?
+            GROUP BY token_name
+            ''', (EXPRESSION_ALERT_TYPE,))
+            counts = {row['token_name']: row['total'] for row in self.cursor.fetchall()}
+            
+            accepted = []
+            rejected = []
+            for alert in alerts:
+                # Las alertas compuestas no cuentan para el límite por token (igual que en /alert)
+                if alert['alert_type'] != EXPRESSION_ALERT_TYPE:
+                    token_name = alert['token_name']
+                    if counts.get(token_name, 0) >= max_alerts_per_token:
+                        rejected.append(alert)
+                        continue
+                    counts[token_name] = counts.get(token_name, 0) + 1
+                accepted.append((alert['token_name'], alert['token_contract'], alert['alert_type'],
+                                 alert['target_price'], alert['window_seconds'], alert['expression']))
+            
+            self.cursor.executemany('''
+            INSERT INTO alerts (token_name, token_contract, alert_type, target_price, window_seconds, expression)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', accepted)
+            self.conn.commit()
+            
+            logger.info(f"Importación masiva: {len(accepted)} alertas añadidas, {len(rejected)} rechazadas")
+            return len(accepted), rejected
+        except sqlite3.Error as e:
+            logger.error(f"Error al añadir alertas en bloque: {e}")
+            self.conn.rollback()
+            raise
+    
+    def iter_active_alerts(self):
+        """Recorre las alertas activas fila a fila, sin cargarlas todas en memoria"""
+        try:
+            # Cursor propio para no interferir con self.cursor mientras se itera
+            cursor = self.conn.execute('''
+            SELECT * FROM alerts WHERE is_active = 1 ORDER BY token_name, id
+            ''')
+        except sqlite3.Error as e:
+            logger.error(f"Error al recorrer las alertas activas: {e}")
+            raise
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+    
     def get_active_alerts(self):
         """Obtiene todas las alertas activas"""
         try:
@@ -105,6 +232,34 @@ class CryptoDatabase:
             logger.error(f"Error al obtener alertas activas: {e}")
             raise
     
+    def count_active_alerts(self):
+        """Cuenta las alertas activas sin cargarlas"""
+        try:
+            self.cursor.execute('''
+            SELECT COUNT(*) FROM alerts WHERE is_active = 1
+            ''')
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Error al contar alertas activas: {e}")
+            raise
+    
+    def get_alerts_fingerprint(self):
+        """
+        Huella de las alertas activas: (número, id máximo, suma de ids)
+
+        Cambia al crear, activar, desactivar o eliminar alertas, y permite
+        comprobar si una instantánea de estado corresponde a la base de datos.
+        """
+        try:
+            self.cursor.execute('''
+            SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(id), 0)
+            FROM alerts WHERE is_active = 1
+            ''')
+            return tuple(self.cursor.fetchone())
+        except sqlite3.Error as e:
+            logger.error(f"Error al calcular la huella de las alertas: {e}")
+            raise
+    
     def get_alerts_by_token(self, token_name):
         """Obtiene todas las alertas para un token específico"""
         try:
@@ -173,6 +328,54 @@ class CryptoDatabase:
             logger.error(f"Error al obtener todas las alertas: {e}")
             raise
     
+    def add_price_history(self, prices):
+        """
+        Guarda en el historial los precios obtenidos en una verificación
+
+        Args:
+            prices (dict): Nombre del token -> precio
+        """
+        try:
+            self.cursor.executemany('''
+            INSERT INTO price_history (token_name, price) VALUES (?, ?)
+            ''', [(token_name.upper(), price) for token_name, price in prices.items()])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error al guardar el historial de precios: {e}")
+            self.conn.rollback()
+            raise
+    
+    def prune_price_history(self, days):
+        """
+        Elimina del historial los precios con más de N días
+
+        Returns:
+            int: Número de registros eliminados
+        """
+        try:
+            self.cursor.execute('''
+            DELETE FROM price_history WHERE timestamp < datetime('now', ?)
+            ''', (f"-{int(days)} days",))
+            self.conn.commit()
+            return self.cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error al limpiar el historial de precios: {e}")
+            self.conn.rollback()
+            raise
+    
+    def get_price_history(self, token_name, seconds):
+        """Obtiene los precios de un token en los últimos N segundos, del más antiguo al más reciente"""
+        try:
+            self.cursor.execute('''
+            SELECT timestamp, price FROM price_history
+            WHERE token_name = ? AND timestamp >= datetime('now', ?)
+            ORDER BY timestamp
+            ''', (token_name.upper(), f"-{int(seconds)} seconds"))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener el historial de precios de {token_name}: {e}")
+            raise
+    
     def close(self):
         """Cierra la conexión a la base de datos"""
         if self.conn:
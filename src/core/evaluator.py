@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Obtención de precios y evaluación de alertas para un conjunto de tokens
+"""
+
+import time
+import logging
+from src.core.database import WINDOW_ALERT_TYPES
+from src.core.windows import WindowStore
+from src.core.http_cache import get_http_client
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Ventanas deslizantes de precios de este proceso. En modo multiproceso cada worker
+# tiene las suyas, y el hashing consistente mantiene cada token en el mismo worker.
+window_store = WindowStore()
+
+# URL de la API de CoinGecko para consultar precios
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price?ids={token_id}&vs_currencies=usd"
+
+
+def fetch_token_price(token_name):
+    """
+    Consulta el precio actual de un token en CoinGecko
+
+    Args:
+        token_name (str): Nombre del token tal y como se guarda en la base de datos
+
+    Returns:
+        tuple: (precio, error). Si la consulta falla el precio es None y error contiene el mensaje
+    """
+    # Convertir el nombre del token a minúsculas para la API
+    token_id = token_name.lower()
+    url = COINGECKO_PRICE_URL.format(token_id=token_id)
+    response = get_http_client().get(url)
+
+    if response.status_code == 200:
+        data = response.json()
+        if token_id in data and 'usd' in data[token_id]:
+            return data[token_id]['usd'], None
+        return None, f"⚠️ No se encontró información de precio para {token_name}"
+    return None, f"⚠️ Error al consultar precio de {token_name}: Código {response.status_code}"
+
+
+def check_alert(alert, current_price, window=None):
+    """
+    Indica si una alerta se cumple
+
+    Args:
+        alert (dict): Alerta de la base de datos
+        current_price (float): Precio actual del token
+        window (RollingWindow, optional): Ventana de precios, necesaria en las alertas de variación
+    """
+    alert_type = alert['alert_type']
+    target_price = alert['target_price']
+    if alert_type in WINDOW_ALERT_TYPES:
+        rise = window.rise_percent()
+        drop = window.drop_percent()
+        return (alert_type in ('up', 'move') and rise >= target_price) or \
+               (alert_type in ('down', 'move') and drop >= target_price)
+    return (alert_type == 'above' and current_price >= target_price) or \
+           (alert_type == 'below' and current_price <= target_price)
+
+
+def window_keys(tokens):
+    """
+    Ventanas (token, segundos) que usan las alertas de variación
+
+    Args:
+        tokens (dict): Nombre del token -> lista de alertas (dict) de ese token
+    """
+    return {(token_name, alert['window_seconds'])
+            for token_name, alerts in tokens.items()
+            for alert in alerts
+            if alert['alert_type'] in WINDOW_ALERT_TYPES}
+
+
+def evaluate_partition(tokens, retain=True):
+    """
+    Obtiene los precios de un conjunto de tokens y evalúa sus alertas
+
+    No escribe en la base de datos ni envía mensajes, de modo que puede ejecutarse
+    tanto en el proceso principal como en un proceso worker. Cada precio obtenido
+    se añade a las ventanas deslizantes que usan las alertas de variación.
+
+    Args:
+        tokens (dict): Nombre del token -> lista de alertas (dict) de ese token
+        retain (bool): Liberar las ventanas de tokens que no están en 'tokens'. Si los tokens
+                       se evalúan por lotes, se debe hacer una sola vez con todos (ver window_keys)
+
+    Returns:
+        dict: 'prices' (token -> precio), 'triggered' (alertas disparadas) y 'errors'
+              (tuplas (token_name, mensaje))
+    """
+    prices = {}
+    triggered = []
+    errors = []
+
+    for token_name, alerts in tokens.items():
+        window_lengths = [alert['window_seconds'] for alert in alerts
+                          if alert['alert_type'] in WINDOW_ALERT_TYPES]
+        try:
+            current_price, error = fetch_token_price(token_name)
+            if error:
+                errors.append((token_name, error))
+                continue
+
+            prices[token_name] = current_price
+            windows = window_store.update(token_name, current_price, window_lengths, time.time())
+            for alert in alerts:
+                window = windows.get(alert['window_seconds'])
+                if check_alert(alert, current_price, window):
+                    triggered.append({
+                        'id': alert['id'],
+                        'token_name': token_name,
+                        'alert_type': alert['alert_type'],
+                        'target_price': alert['target_price'],
+                        'window_seconds': alert['window_seconds'],
+                        'change_percent': window.change_percent() if window else None,
+                        'current_price': current_price
+                    })
+        except Exception as e:
+            errors.append((token_name, f"⚠️ Error al procesar {token_name}: {str(e)}"))
+
+    # Liberar las ventanas de alertas que ya no están activas
+    if retain:
+        window_store.retain(window_keys(tokens))
+
+    return {'prices': prices, 'triggered': triggered, 'errors': errors}
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Alertas compuestas: expresiones booleanas sobre precios de tokens
+
+Ejemplo: ETH < 2500 AND BTC > 60000
+
+Las expresiones se analizan una sola vez al crearse y se compilan a funciones
+anidadas (closures). En cada tick solo se vuelven a evaluar las expresiones que
+dependen de algún token cuyo precio ha cambiado.
+"""
+
+import re
+import logging
+import operator
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Operadores de comparación admitidos
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+# Palabras reservadas (no pueden usarse como nombre de token)
+KEYWORDS = ('AND', 'OR', 'NOT')
+
+# Elementos léxicos: números, comparaciones, paréntesis y nombres (tokens o palabras reservadas).
+# Un nombre puede empezar por cifras (1INCH) pero debe tener alguna letra; un número no puede ir
+# seguido de letras, para que 1INCH no se lea como el número 1 y el nombre INCH
+_TOKEN_RE = re.compile(r'\s*(?:(\d+(?:\.\d*)?(?![A-Za-z0-9_.])|\.\d+(?![A-Za-z0-9_.]))|(<=|>=|==|!=|<|>)|([()])|'
+                       r'(\d*[A-Za-z][A-Za-z0-9_-]*))')
+
+
+class ExpressionError(ValueError):
+    """Error de sintaxis en una expresión de alerta"""
+
+
+def looks_like_expression(text):
+    """Indica si el texto de /alert es una expresión en lugar del formato clásico"""
+    return any(symbol in text for symbol in '<>=!')
+
+
+def _tokenize(text):
+    """Divide la expresión en una lista de (tipo, valor)"""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise ExpressionError(f"Carácter inesperado en la posición {position + 1}: '{text[position]}'")
+        number, comparison, paren, name = match.groups()
+        if number is not None:
+            tokens.append(('number', float(number)))
+        elif comparison is not None:
+            tokens.append(('cmp', comparison))
+        elif paren is not None:
+            tokens.append((paren, paren))
+        elif name.upper() in KEYWORDS:
+            tokens.append((name.upper(), name.upper()))
+        else:
+            tokens.append(('name', name.upper()))
+        position = match.end()
+    return tokens
+
+
+def _format_number(value):
+    """Formatea un número sin notación científica para que la expresión pueda volver a analizarse"""
+    return format(value, '.15f').rstrip('0').rstrip('.')
+
+
+# Descripción de los elementos esperados en los mensajes de error
+_EXPECTED = {'cmp': "un comparador (<, <=, >, >=, ==, !=)"}
+
+
+class _Parser:
+    """
+    Analizador descendente recursivo. Gramática:
+
+        expr       := and_expr (OR and_expr)*
+        and_expr   := not_expr (AND not_expr)*
+        not_expr   := NOT not_expr | primary
+        primary    := '(' expr ')' | comparison
+        comparison := operand cmp operand
+        operand    := número | token
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.names = set()
+
+    def _peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _take(self, kind):
+        if self._peek() != kind:
+            found = self.tokens[self.position][1] if self.position < len(self.tokens) else "el final"
+            expected = _EXPECTED.get(kind, f"'{kind}'")
+            raise ExpressionError(f"Se esperaba {expected} y se encontró {found}")
+        value = self.tokens[self.position][1]
+        self.position += 1
+        return value
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("La expresión está vacía")
+        fn = self._expr()
+        if self.position != len(self.tokens):
+            raise ExpressionError(f"Elemento inesperado: {self.tokens[self.position][1]}")
+        return fn
+
+    def _expr(self):
+        terms = [self._and_expr()]
+        while self._peek() == 'OR':
+            self._take('OR')
+            terms.append(self._and_expr())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda prices: any(term(prices) for term in terms)
+
+    def _and_expr(self):
+        terms = [self._not_expr()]
+        while self._peek() == 'AND':
+            self._take('AND')
+            terms.append(self._not_expr())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda prices: all(term(prices) for term in terms)
+
+    def _not_expr(self):
+        if self._peek() == 'NOT':
+            self._take('NOT')
+            inner = self._not_expr()
+            return lambda prices: not inner(prices)
+        return self._primary()
+
+    def _primary(self):
+        if self._peek() == '(':
+            self._take('(')
+            fn = self._expr()
+            self._take(')')
+            return fn
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._operand()
+        compare = COMPARISONS[self._take('cmp')]
+        right = self._operand()
+        return lambda prices: compare(left(prices), right(prices))
+
+    def _operand(self):
+        kind = self._peek()
+        if kind == 'number':
+            value = self._take('number')
+            return lambda prices: value
+        if kind == 'name':
+            name = self._take('name')
+            self.names.add(name)
+            return lambda prices: prices[name]
+        raise ExpressionError("Se esperaba un número o un token")
+
+
+class CompiledExpression:
+    """Expresión compilada junto con los tokens de los que depende"""
+
+    def __init__(self, source):
+        """
+        Analiza y compila la expresión
+
+        Raises:
+            ExpressionError: Si la expresión no es válida
+        """
+        parser = _Parser(_tokenize(source))
+        self._fn = parser.parse()
+        if not parser.names:
+            raise ExpressionError("La expresión debe usar al menos un token")
+        self.source = ' '.join(_format_number(value) if kind == 'number' else value
+                               for kind, value in parser.tokens)
+        self.tokens = frozenset(parser.names)
+
+    def evaluate(self, prices):
+        """
+        Evalúa la expresión con los precios dados
+
+        Returns:
+            bool o None: None si falta el precio de algún token
+        """
+        if not self.tokens.issubset(prices):
+            return None
+        return bool(self._fn(prices))
+
+
+class ExpressionIndex:
+    """
+    Expresiones activas indexadas por token
+
+    Guarda el último precio visto de cada token y el último resultado de cada
+    expresión, de modo que en cada tick solo se evalúan las expresiones con
+    algún token cuyo precio ha cambiado.
+    """
+
+    def __init__(self):
+        self._compiled = {}   # alert_id -> CompiledExpression
+        self._by_token = {}   # token -> set(alert_id)
+        self._results = {}    # alert_id -> último resultado
+        self._prices = {}     # token -> último precio visto
+
+    def sync(self, alerts):
+        """
+        Actualiza el índice con las alertas de expresión activas
+
+        Solo se compilan las expresiones nuevas; las ya compiladas se reutilizan.
+        """
+        current = {alert['id']: alert['expression'] for alert in alerts}
+        for alert_id in list(self._compiled):
+            if current.get(alert_id) is None:
+                self._remove(alert_id)
+        for alert_id in list(self._results):
+            if alert_id not in current:
+                del self._results[alert_id]
+        for alert_id, source in current.items():
+            if alert_id in self._compiled:
+                continue
+            try:
+                compiled = CompiledExpression(source)
+            except ExpressionError as e:
+                logger.error(f"Expresión inválida en la alerta {alert_id}: {e}")
+                continue
+            self._compiled[alert_id] = compiled
+            for token in compiled.tokens:
+                self._by_token.setdefault(token, set()).add(alert_id)
+
+    def _remove(self, alert_id):
+        compiled = self._compiled.pop(alert_id)
+        self._results.pop(alert_id, None)
+        for token in compiled.tokens:
+            ids = self._by_token.get(token)
+            if ids is not None:
+                ids.discard(alert_id)
+                if not ids:
+                    del self._by_token[token]
+
+    def export_results(self):
+        """Devuelve el último resultado de cada expresión (para la instantánea de estado)"""
+        return dict(self._results)
+
+    def restore(self, results, prices):
+        """
+        Restaura resultados y precios guardados en una instantánea
+
+        Las expresiones se vuelven a compilar en el siguiente sync(); solo se
+        evaluarán las que tengan algún token con precio distinto al guardado.
+        """
+        self._results.update(results)
+        self._prices.update(prices)
+
+    @property
+    def tokens(self):
+        """Tokens de los que dependen las expresiones activas"""
+        return set(self._by_token)
+
+    def get(self, alert_id):
+        """Devuelve la expresión compilada de una alerta"""
+        return self._compiled.get(alert_id)
+
+    def evaluate(self, prices):
+        """
+        Evalúa las expresiones afectadas por los precios nuevos
+
+        Args:
+            prices (dict): Token -> precio obtenido en este tick
+
+        Returns:
+            list: IDs de las alertas cuya expresión se cumple con precios de este tick
+        """
+        # Un token sin precio en este tick (error al consultarlo) invalida el último
+        # precio visto y el resultado de las expresiones que dependen de él
+        for token in [token for token in self._by_token if token not in prices]:
+            self._prices.pop(token, None)
+            for alert_id in self._by_token[token]:
+                self._results.pop(alert_id, None)
+
+        changed = {token for token, price in prices.items() if self._prices.get(token) != price}
+        self._prices.update(prices)
+
+        # Expresiones nuevas (sin resultado) o con algún token cuyo precio ha cambiado
+        pending = {alert_id for alert_id in self._compiled if alert_id not in self._results}
+        for token in changed:
+            pending.update(self._by_token.get(token, ()))
+
+        for alert_id in pending:
+            result = self._compiled[alert_id].evaluate(self._prices)
+            if result is not None:
+                self._results[alert_id] = result
+
+        triggered = []
+        for alert_id, result in self._results.items():
+            compiled = self._compiled.get(alert_id)
+            if result and compiled is not None and all(token in prices for token in compiled.tokens):
+                triggered.append(alert_id)
+        return triggered
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP con peticiones condicionales y caché de respuestas JSON
+
+Guarda ETag/Last-Modified de cada URL y los envía como If-None-Match/If-Modified-Since.
+Respeta Cache-Control max-age, de modo que mientras una respuesta está fresca no se
+hace ninguna petición, y una respuesta 304 reutiliza el JSON ya analizado.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Cliente compartido del proceso actual (cada worker crea el suyo)
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+class CachedResponse:
+    """Respuesta con la misma interfaz básica que requests.Response"""
+
+    def __init__(self, status_code, payload=None, text='', from_cache=False):
+        self.status_code = status_code
+        self.text = text
+        self.from_cache = from_cache
+        self._payload = payload
+
+    def json(self):
+        """Devuelve el JSON ya analizado (no se vuelve a analizar en las respuestas cacheadas)"""
+        return self._payload
+
+
+class _CacheEntry:
+    """Respuesta guardada para una URL"""
+
+    __slots__ = ('payload', 'size', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, payload, size, etag, last_modified, expires_at):
+        self.payload = payload
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+
+def _parse_cache_control(header):
+    """
+    Interpreta la cabecera Cache-Control
+
+    Returns:
+        tuple: (se puede guardar, segundos de frescura)
+    """
+    if not header:
+        return True, 0
+    directives = header.lower()
+    if 'no-store' in directives:
+        return False, 0
+    if 'no-cache' in directives:
+        return True, 0
+    match = re.search(r'max-age=(\d+)', directives)
+    return True, int(match.group(1)) if match else 0
+
+
+class CachedHttpClient:
+    """Cliente HTTP para APIs JSON con caché condicional por URL"""
+
+    def __init__(self, max_entries=1024, timeout=30):
+        """
+        Inicializa el cliente
+
+        Args:
+            max_entries (int): Número máximo de URLs guardadas (se descartan las menos usadas)
+            timeout (int): Tiempo máximo de espera de cada petición en segundos
+        """
+        # Importación diferida para no cargar requests al arrancar el bot
+        import requests
+        self._session = requests.Session()
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _endpoint_stats(self, url):
+        """Contadores del endpoint (ruta de la URL sin parámetros)"""
+        endpoint = urlparse(url).path
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                'requests': 0,
+                'network': 0,
+                'fresh_hits': 0,
+                'not_modified': 0,
+                'bytes_downloaded': 0,
+                'bytes_saved': 0
+            }
+        return stats
+
+    def get(self, url):
+        """
+        Hace una petición GET de una API JSON usando la caché
+
+        Returns:
+            CachedResponse: status_code 200 con el JSON (de la red o de la caché),
+                            o el código de error recibido
+        """
+        with self._lock:
+            stats = self._endpoint_stats(url)
+            stats['requests'] += 1
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                # Respuesta todavía fresca según max-age: no hace falta ir a la red
+                if entry.expires_at > time.time():
+                    stats['fresh_hits'] += 1
+                    stats['bytes_saved'] += entry.size
+                    return CachedResponse(200, entry.payload, from_cache=True)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self._session.get(url, headers=headers, timeout=self.timeout)
+        cacheable, max_age = _parse_cache_control(response.headers.get('Cache-Control'))
+
+        with self._lock:
+            stats['network'] += 1
+            stats['bytes_downloaded'] += len(response.content)
+
+            # El recurso no ha cambiado: reutilizar el JSON ya analizado
+            if response.status_code == 304 and entry is not None:
+                stats['not_modified'] += 1
+                stats['bytes_saved'] += entry.size
+                entry.expires_at = time.time() + max_age
+                return CachedResponse(200, entry.payload, from_cache=True)
+
+            if response.status_code != 200:
+                return CachedResponse(response.status_code, text=response.text)
+
+            payload = response.json()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if cacheable and (etag or last_modified or max_age):
+                self._entries[url] = _CacheEntry(payload, len(response.content), etag,
+                                                 last_modified, time.time() + max_age)
+                self._entries.move_to_end(url)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.pop(url, None)
+            return CachedResponse(200, payload)
+
+    def stats(self):
+        """Devuelve una copia de los contadores por endpoint"""
+        with self._lock:
+            return {endpoint: dict(values) for endpoint, values in self._stats.items()}
+
+    def totals(self):
+        """Suma de los contadores de todos los endpoints"""
+        return sum_counters(self.stats().values())
+
+
+def sum_counters(counters):
+    """
+    Suma contadores con las mismas claves
+
+    Args:
+        counters (iterable): Diccionarios clave -> contador (p. ej. totals() de varios procesos)
+    """
+    totals = {}
+    for values in counters:
+        for key, value in values.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def get_http_client():
+    """
+    Devuelve el cliente HTTP del proceso actual
+
+    Tras un fork (procesos worker) se crea uno nuevo para no compartir conexiones.
+    """
+    global _client, _client_pid
+    # La tarea programada lo usa desde varios hilos a la vez
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = CachedHttpClient()
+            _client_pid = os.getpid()
+        return _client
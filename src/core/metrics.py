@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Muestreo periódico en segundo plano de métricas del sistema y del bot
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class BotMetrics:
+    """Métricas internas del bot que actualizan la tarea programada y los manejadores"""
+
+    def __init__(self, history_size=120):
+        """
+        Inicializa las métricas
+
+        Args:
+            history_size (int): Número de duraciones de tick que se conservan
+        """
+        self.tick_durations = deque(maxlen=history_size)
+        self.tick_count = 0
+        self._gauges = {}
+
+    def record_tick(self, duration):
+        """Registra la duración (segundos) de una ejecución de la tarea programada"""
+        self.tick_durations.append(duration)
+        self.tick_count += 1
+
+    def register_gauge(self, name, fn):
+        """
+        Registra una función que devuelve el valor actual de una métrica
+
+        Se llama desde el hilo de muestreo, así que solo debe leer valores.
+        """
+        self._gauges[name] = fn
+
+    def snapshot(self):
+        """Devuelve un diccionario con el valor actual de todas las métricas del bot"""
+        durations = list(self.tick_durations)
+        values = {
+            'tick_count': self.tick_count,
+            'last_tick_duration': durations[-1] if durations else None,
+            'avg_tick_duration': sum(durations) / len(durations) if durations else None
+        }
+        for name, fn in list(self._gauges.items()):
+            try:
+                values[name] = fn()
+            except Exception as e:
+                logger.debug(f"No se pudo leer la métrica {name}: {e}")
+                values[name] = None
+        return values
+
+
+class MetricsSampler:
+    """
+    Toma muestras de CPU, memoria, disco, red y métricas del bot cada cierto intervalo
+
+    Las muestras se guardan en un buffer circular de tamaño fijo, de modo que /ping
+    solo tiene que leer la última en lugar de consultar psutil en cada petición.
+    """
+
+    def __init__(self, bot_metrics, interval=30, history_size=120):
+        """
+        Inicializa el muestreador
+
+        Args:
+            bot_metrics (BotMetrics): Métricas del bot que se incluyen en cada muestra
+            interval (int): Segundos entre muestras
+            history_size (int): Número de muestras que se conservan
+        """
+        self.bot_metrics = bot_metrics
+        self.interval = interval
+        self.samples = deque(maxlen=history_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self.static_info = None
+
+    def start(self):
+        """Arranca el hilo de muestreo"""
+        if self._thread is not None:
+            return
+        # Importación diferida: psutil y platform solo se cargan si se usan las métricas
+        import platform
+        import psutil
+
+        # Información que no cambia mientras el bot está en marcha
+        self.static_info = {
+            'os': platform.system() + ' ' + platform.release(),
+            'python': platform.python_version(),
+            'cpu': platform.processor(),
+            'hostname': platform.node()
+        }
+        # La primera llamada a cpu_percent sin intervalo devuelve 0; sirve de referencia
+        psutil.cpu_percent(interval=None)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"Muestreo de métricas iniciado (cada {self.interval}s)")
+
+    def stop(self):
+        """Detiene el hilo de muestreo"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def resize(self, history_size):
+        """Cambia el número de muestras que se conservan, manteniendo las más recientes"""
+        # Se sustituye el buffer completo de una vez; el hilo de muestreo usa el nuevo en la siguiente muestra
+        self.samples = deque(self.samples, maxlen=history_size)
+
+    def _run(self):
+        """Bucle del hilo de muestreo"""
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error al tomar muestra de métricas: {e}")
+            if self._stop.wait(self.interval):
+                break
+
+    def sample(self):
+        """Toma una muestra y la añade al buffer"""
+        import psutil
+
+        memory = psutil.virtual_memory()
+        sample = {
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_used': memory.used,
+            'memory_total': memory.total,
+            'disk_percent': psutil.disk_usage('/').percent,
+            'bot': self.bot_metrics.snapshot()
+        }
+        try:
+            net_io = psutil.net_io_counters()
+            sample['net_bytes_sent'] = net_io.bytes_sent
+            sample['net_bytes_recv'] = net_io.bytes_recv
+        except Exception:
+            pass
+
+        self.samples.append(sample)
+        return sample
+
+    def latest(self):
+        """Devuelve la última muestra, tomando una si todavía no hay ninguna"""
+        if not self.samples:
+            return self.sample()
+        return self.samples[-1]
+
+
+def hit_rate(hits, misses):
+    """Porcentaje de aciertos de una caché, o None si todavía no se ha usado"""
+    total = hits + misses
+    return hits / total * 100 if total else None
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Modo de perfilado de la tarea programada y los manejadores de comandos
+
+Mientras está desactivado, cada llamada solo comprueba un contador. Al activarlo con
+arm(n), las siguientes n ejecuciones de las funciones decoradas con profiled se
+ejecutan bajo cProfile; cada perfil se guarda en data/profiles/ (se puede abrir con
+pstats o snakeviz) y se genera un resumen de las funciones más costosas.
+
+cProfile mide todo lo que ocurre en el hilo del bucle de eventos mientras dura la
+ejecución, incluidas otras tareas que se ejecuten mientras la función espera.
+"""
+
+import os
+import time
+import logging
+import functools
+from pathlib import Path
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Directorio por defecto de los perfiles guardados
+DEFAULT_PROFILE_DIR = Path(__file__).parent.parent.parent / 'data' / 'profiles'
+
+# Número de funciones que se muestran en el resumen
+PROFILE_TOP_FUNCTIONS = 15
+
+
+def summarize_stats(stats, top=PROFILE_TOP_FUNCTIONS):
+    """
+    Resumen en texto de las funciones con más tiempo propio
+
+    Args:
+        stats (pstats.Stats): Estadísticas de un perfil
+        top (int): Número de funciones a incluir
+
+    Returns:
+        str: Una línea por función: tiempo propio, tiempo acumulado, llamadas y ubicación
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    lines = [f"{'propio':>8} {'acum.':>8} {'llamadas':>9}  función"]
+    for (filename, line, function), (_, calls, own_time, cumulative_time, _) in rows:
+        # Las funciones internas de Python no tienen archivo ('~')
+        location = f" ({os.path.basename(filename)}:{line})" if line else ""
+        lines.append(f"{own_time:8.4f} {cumulative_time:8.4f} {calls:9d}  {function}{location}")
+    return "\n".join(lines)
+
+
+class Profiler:
+    """Perfila las próximas ejecuciones de las funciones decoradas"""
+
+    def __init__(self, profile_dir=DEFAULT_PROFILE_DIR, top=PROFILE_TOP_FUNCTIONS):
+        """
+        Inicializa el perfilador
+
+        Args:
+            profile_dir (str): Directorio donde se guardan los perfiles
+            top (int): Número de funciones de los resúmenes
+        """
+        self.profile_dir = Path(profile_dir)
+        self.top = top
+        self.remaining = 0
+        # Corrutina que recibe (nombre, duración, ruta del perfil, resumen) al terminar cada perfil
+        self.reporter = None
+        self._active = False
+
+    def arm(self, runs):
+        """Perfila las próximas 'runs' ejecuciones (0 desactiva el perfilado)"""
+        self.remaining = max(0, runs)
+        logger.info(f"Perfilado {'activado para ' + str(runs) + ' ejecuciones' if runs else 'desactivado'}")
+
+    def profiled(self, fn):
+        """Decorador para funciones async que se perfilan mientras el perfilador está activo"""
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            # cProfile no admite dos perfiles a la vez en el mismo hilo
+            if not self.remaining or self._active:
+                return await fn(*args, **kwargs)
+            return await self._run(fn, args, kwargs)
+        return wrapper
+
+    async def _run(self, fn, args, kwargs):
+        """Ejecuta fn bajo cProfile, guarda el perfil y envía el resumen"""
+        # Importación diferida: cProfile y pstats solo se cargan al perfilar
+        import cProfile
+        import pstats
+
+        self.remaining -= 1
+        self._active = True
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            self._active = False
+            duration = time.perf_counter() - start
+            try:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                # Milisegundos en el nombre para no sobrescribir perfiles del mismo segundo
+                now = time.time()
+                stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+                path = self.profile_dir / f"{stamp}-{fn.__name__}.prof"
+                profile.dump_stats(path)
+                summary = summarize_stats(pstats.Stats(profile), self.top)
+                logger.info(f"Perfil de {fn.__name__} ({duration:.3f}s) guardado en {path}")
+                if self.reporter is not None:
+                    await self.reporter(fn.__name__, duration, path, summary)
+            except Exception as e:
+                logger.error(f"Error al guardar el perfil de {fn.__name__}: {e}")
+
+
+# Perfilador compartido por la tarea programada y los manejadores
+profiler = Profiler()
+profiled = profiler.profiled
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Prioridad de los comandos interactivos sobre el trabajo en segundo plano
+
+Todo el bot comparte un único bucle de eventos. La tarea programada divide su
+trabajo en lotes y, antes de cada lote, cede el paso mientras haya comandos en
+curso. Las llamadas bloqueantes (HTTP) se ejecutan en hilos: los comandos usan su
+propio pool, de modo que nunca esperan detrás de un lote de la tarea programada,
+y un semáforo limita cuántos lotes en segundo plano hay en ejecución a la vez.
+
+La base de datos se sigue usando solo desde el hilo del bucle de eventos, porque
+la conexión de sqlite3 no se puede compartir entre hilos.
+"""
+
+import asyncio
+import logging
+import functools
+import contextlib
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Segundos máximos que un lote en segundo plano cede el paso a los comandos,
+# para que un flujo continuo de comandos no detenga la tarea programada
+INTERACTIVE_MAX_WAIT = 5
+
+# Hilos para las llamadas bloqueantes de los comandos
+INTERACTIVE_THREADS = 4
+
+
+class PriorityScheduler:
+    """Reparte el bucle de eventos y los hilos entre comandos y trabajo en segundo plano"""
+
+    def __init__(self, max_background=2, interactive_threads=INTERACTIVE_THREADS):
+        """
+        Inicializa el planificador
+
+        Args:
+            max_background (int): Lotes en segundo plano que pueden ejecutarse a la vez
+            interactive_threads (int): Hilos para las llamadas bloqueantes de los comandos
+        """
+        self.max_background = max(1, max_background)
+        self.interactive_threads = interactive_threads
+        self.interactive_active = 0
+        self.background_running = 0
+        self.background_waiting = 0
+        # Se crean al usarse por primera vez, dentro del bucle de eventos
+        self._idle = None
+        self._semaphore = None
+        self._background_executor = None
+        self._interactive_executor = None
+
+    def _idle_event(self):
+        """Evento activo mientras no hay comandos en curso"""
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if not self.interactive_active:
+                self._idle.set()
+        return self._idle
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_background)
+        return self._semaphore
+
+    def _get_background_executor(self):
+        if self._background_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._background_executor = ThreadPoolExecutor(
+                max_workers=self.max_background, thread_name_prefix="background")
+        return self._background_executor
+
+    def _get_interactive_executor(self):
+        if self._interactive_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._interactive_executor = ThreadPoolExecutor(
+                max_workers=self.interactive_threads, thread_name_prefix="interactive")
+        return self._interactive_executor
+
+    @contextlib.asynccontextmanager
+    async def interactive(self):
+        """Marca un comando en curso: el trabajo en segundo plano no empieza lotes nuevos"""
+        self.interactive_active += 1
+        self._idle_event().clear()
+        try:
+            yield
+        finally:
+            self.interactive_active -= 1
+            if not self.interactive_active:
+                self._idle_event().set()
+
+    def interactive_handler(self, fn):
+        """Decorador para manejadores de comandos, que tienen prioridad sobre la tarea programada"""
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            async with self.interactive():
+                return await fn(*args, **kwargs)
+        return wrapper
+
+    async def yield_to_interactive(self):
+        """Cede el bucle de eventos y espera, con un límite, a que terminen los comandos en curso"""
+        if not self.interactive_active:
+            await asyncio.sleep(0)
+            return
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), INTERACTIVE_MAX_WAIT)
+        except asyncio.TimeoutError:
+            logger.debug("Lote en segundo plano reanudado con comandos todavía en curso")
+
+    async def run_background(self, fn, *args, **kwargs):
+        """
+        Ejecuta una llamada bloqueante de la tarea programada en un hilo
+
+        Espera a que haya hueco entre los lotes en segundo plano admitidos y
+        cede el paso a los comandos en curso antes de empezar.
+        """
+        self.background_waiting += 1
+        semaphore = self._get_semaphore()
+        async with semaphore:
+            # Ceder el paso justo antes de ejecutar, por si ha llegado un comando mientras se esperaba
+            await self.yield_to_interactive()
+            self.background_waiting -= 1
+            self.background_running += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._get_background_executor(), functools.partial(fn, *args, **kwargs))
+            finally:
+                self.background_running -= 1
+
+    async def run_interactive(self, fn, *args, **kwargs):
+        """Ejecuta una llamada bloqueante de un comando en el pool de hilos de los comandos"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_interactive_executor(), functools.partial(fn, *args, **kwargs))
+
+    def resize(self, max_background):
+        """
+        Cambia el número de lotes en segundo plano admitidos
+
+        Los lotes en curso terminan con el semáforo y el pool anteriores.
+        """
+        max_background = max(1, max_background)
+        if max_background == self.max_background:
+            return
+        self.max_background = max_background
+        self._semaphore = None
+        if self._background_executor is not None:
+            self._background_executor.shutdown(wait=False)
+            self._background_executor = None
+
+    def shutdown(self):
+        """Detiene los pools de hilos"""
+        for executor in (self._background_executor, self._interactive_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._background_executor = None
+        self._interactive_executor = None
+
+
+def chunked(items, size):
+    """Divide una lista en lotes de como mucho 'size' elementos"""
+    size = max(1, size)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+# Planificador compartido por la tarea programada y los manejadores
+scheduler = PriorityScheduler()
+interactive = scheduler.interactive_handler
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Instantánea binaria del estado en memoria para arranques en caliente
+
+Guarda junto a la base de datos la caché de precios, las ventanas de precios,
+los resultados de las alertas compuestas y el estado de disparo de cada alerta.
+
+Formato (little endian, todo empaquetado con struct):
+
+    cabecera   magic 'CABS', versión, creado, huella de la BD (activas, id máximo, suma de ids)
+    precios    n x (token, precio, timestamp)
+    disparos   n x (id de alerta, timestamp del último aviso)
+    ventanas   n x (token, segundos, m x (timestamp, precio))
+    compuestas n x (id de alerta, resultado)
+    crc32      de todo lo anterior
+"""
+
+import os
+import time
+import zlib
+import struct
+import logging
+from pathlib import Path
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto, junto a data/crypto_alerts.db
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent.parent / 'data' / 'state.snapshot'
+
+MAGIC = b'CABS'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHdIIQ')
+_COUNT = struct.Struct('<I')
+_NAME_LENGTH = struct.Struct('<H')
+_PRICE = struct.Struct('<dd')
+_TRIGGER = struct.Struct('<Id')
+_WINDOW = struct.Struct('<II')
+_SAMPLE = struct.Struct('<dd')
+_RESULT = struct.Struct('<I?')
+_CRC = struct.Struct('<I')
+
+
+class SnapshotError(ValueError):
+    """La instantánea está dañada o tiene un formato desconocido"""
+
+
+class StateSnapshot:
+    """Estado en memoria del bot que sobrevive a un reinicio"""
+
+    def __init__(self, fingerprint, prices=None, triggers=None, windows=None, expressions=None,
+                 created_at=None):
+        """
+        Args:
+            fingerprint (tuple): Huella de las alertas activas (ver CryptoDatabase.get_alerts_fingerprint)
+            prices (dict): Token -> (precio, timestamp)
+            triggers (dict): ID de alerta -> timestamp del último aviso
+            windows (list): Lista de (token, segundos, [(timestamp, precio), ...])
+            expressions (dict): ID de alerta compuesta -> último resultado
+            created_at (float): Momento de creación, por defecto ahora
+        """
+        self.fingerprint = tuple(fingerprint)
+        self.prices = prices or {}
+        self.triggers = triggers or {}
+        self.windows = windows or []
+        self.expressions = expressions or {}
+        self.created_at = created_at if created_at is not None else time.time()
+
+    @property
+    def age(self):
+        """Segundos transcurridos desde que se creó la instantánea"""
+        return time.time() - self.created_at
+
+
+def _pack_name(name):
+    data = name.encode('utf-8')
+    return _NAME_LENGTH.pack(len(data)) + data
+
+
+def _encode(snapshot):
+    """Serializa una instantánea a bytes"""
+    active_count, max_id, id_sum = snapshot.fingerprint
+    parts = [_HEADER.pack(MAGIC, VERSION, snapshot.created_at, active_count, max_id, id_sum)]
+
+    parts.append(_COUNT.pack(len(snapshot.prices)))
+    for token_name, (price, timestamp) in snapshot.prices.items():
+        parts.append(_pack_name(token_name))
+        parts.append(_PRICE.pack(price, timestamp))
+
+    parts.append(_COUNT.pack(len(snapshot.triggers)))
+    for alert_id, timestamp in snapshot.triggers.items():
+        parts.append(_TRIGGER.pack(alert_id, timestamp))
+
+    parts.append(_COUNT.pack(len(snapshot.windows)))
+    for token_name, window_seconds, samples in snapshot.windows:
+        parts.append(_pack_name(token_name))
+        parts.append(_WINDOW.pack(window_seconds, len(samples)))
+        for timestamp, price in samples:
+            parts.append(_SAMPLE.pack(timestamp, price))
+
+    parts.append(_COUNT.pack(len(snapshot.expressions)))
+    for alert_id, result in snapshot.expressions.items():
+        parts.append(_RESULT.pack(alert_id, result))
+
+    body = b''.join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+class _Reader:
+    """Lectura secuencial de estructuras sobre un buffer"""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, fmt):
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise SnapshotError("La instantánea está truncada")
+        self.offset += fmt.size
+        return values
+
+    def read_name(self):
+        (length,) = self.read(_NAME_LENGTH)
+        if self.offset + length > len(self.data):
+            raise SnapshotError("La instantánea está truncada")
+        name = self.data[self.offset:self.offset + length].decode('utf-8')
+        self.offset += length
+        return name
+
+
+def _decode(data):
+    """Deserializa una instantánea, comprobando el CRC y la versión"""
+    if len(data) < _HEADER.size + _CRC.size:
+        raise SnapshotError("La instantánea está truncada")
+    body, (crc,) = data[:-_CRC.size], _CRC.unpack(data[-_CRC.size:])
+    if zlib.crc32(body) != crc:
+        raise SnapshotError("El CRC de la instantánea no coincide")
+
+    reader = _Reader(body)
+    magic, version, created_at, active_count, max_id, id_sum = reader.read(_HEADER)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"Formato de instantánea desconocido ({magic!r}, versión {version})")
+
+    prices = {}
+    (count,) = reader.read(_COUNT)
+    for _ in range(count):
+        token_name = reader.read_name()
+        prices[token_name] = reader.read(_PRICE)
+
+    triggers = {}
+    (count,) = reader.read(_COUNT)
+    for _ in range(count):
+        alert_id, timestamp = reader.read(_TRIGGER)
+        triggers[alert_id] = timestamp
+
+    windows = []
+    (count,) = reader.read(_COUNT)
+    for _ in range(count):
+        token_name = reader.read_name()
+        window_seconds, sample_count = reader.read(_WINDOW)
+        samples = [reader.read(_SAMPLE) for _ in range(sample_count)]
+        windows.append((token_name, window_seconds, samples))
+
+    expressions = {}
+    (count,) = reader.read(_COUNT)
+    for _ in range(count):
+        alert_id, result = reader.read(_RESULT)
+        expressions[alert_id] = result
+
+    return StateSnapshot((active_count, max_id, id_sum), prices, triggers, windows, expressions,
+                         created_at)
+
+
+def write_snapshot(snapshot, path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Escribe la instantánea de forma atómica
+
+    Se escribe en un archivo temporal, se sincroniza a disco y se renombra,
+    de modo que un corte nunca deja una instantánea a medias.
+    """
+    data = _encode(snapshot)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def read_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Lee la instantánea guardada
+
+    Returns:
+        StateSnapshot o None si no existe o está dañada
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            data = snapshot_file.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"No se pudo leer la instantánea {path}: {e}")
+        return None
+
+    try:
+        return _decode(data)
+    except SnapshotError as e:
+        logger.warning(f"Instantánea descartada: {e}")
+        return None
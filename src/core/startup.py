@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Medición del tiempo de arranque del bot por fases
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Acumula la duración de cada fase del arranque"""
+
+    def __init__(self):
+        """Empieza a contar desde la creación de la instancia"""
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Mide el tiempo que tarda el bloque de código en ejecutarse"""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_start))
+
+    def report(self):
+        """Devuelve un resumen con el tiempo de cada fase y el total"""
+        total = time.perf_counter() - self.started_at
+        lines = ["Perfil de arranque:"]
+        for name, duration in self.phases:
+            lines.append(f"  {name:<24} {duration * 1000:8.1f} ms")
+        lines.append(f"  {'total':<24} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def log_report(self):
+        """Escribe el resumen en el log"""
+        logger.info(self.report())
+
+
+# Instancia global, creada en cuanto se importa el módulo
+startup_profile = StartupProfile()
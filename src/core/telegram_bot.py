@@ -3,11 +3,9 @@
 Script para enviar mensajes por Telegram usando variables de entorno
 """
 
-import os
 import requests
 import json
 from typing import Optional, Dict, Any
-from dotenv import load_dotenv
 
 
 class TelegramBot:
@@ -20,32 +18,22 @@ class TelegramBot:
         Args:
             config_file (str): Ruta al archivo de configuración
         """
-        # Cargar variables de entorno desde el archivo de configuración
-        if config_file is None:
-            from pathlib import Path
-            config_file = Path(__file__).parent.parent.parent / 'config' / 'config.env'
-        load_dotenv(config_file)
-
-        # Obtener configuración desde variables de entorno
-        self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        self.parse_mode = os.getenv("TELEGRAM_PARSE_MODE", "HTML")
-        self.disable_web_page_preview = os.getenv(
-            "TELEGRAM_DISABLE_WEB_PAGE_PREVIEW", "false").lower() == "true"
-        self.disable_notification = os.getenv(
-            "TELEGRAM_DISABLE_NOTIFICATION", "false").lower() == "true"
+        # Reutilizar la configuración ya cargada por el bot, salvo que se indique otro archivo
+        from src.core.config import Config, get_config
+        config = get_config() if config_file is None else Config(config_file)
+
+        # Obtener configuración
+        self.bot_token = config.telegram_bot_token
+        self.chat_id = config.telegram_chat_id
+        self.parse_mode = config.telegram_parse_mode
+        self.disable_web_page_preview = config.telegram_disable_web_page_preview
+        self.disable_notification = config.telegram_disable_notification
 
         # URL base de la API de Telegram
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
 
         # Validar configuración
-        if not self.bot_token or self.bot_token == "tu_token_del_bot_aqui":
-            raise ValueError(
-                "TELEGRAM_BOT_TOKEN no está configurado correctamente")
-
-        if not self.chat_id or self.chat_id == "tu_chat_id_aqui":
-            raise ValueError(
-                "TELEGRAM_CHAT_ID no está configurado correctamente")
+        config.validate_telegram()
 
     def send_message(self,
                      text: str,
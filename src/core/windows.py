@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Ventanas deslizantes de precios para alertas de variación porcentual
+"""
+
+import re
+import time
+from collections import deque
+
+# Unidades aceptadas en las duraciones de las ventanas (/alert BTC move 5 4h)
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Número máximo de muestras que se guardan por ventana
+MAX_SAMPLES = 10000
+
+# Verificaciones que debe abarcar como mínimo una ventana: con menos nunca tendría
+# dos precios (el retraso de la tarea programada deja fuera el más antiguo)
+MIN_WINDOW_CHECKS = 2
+
+
+def parse_window(text):
+    """
+    Convierte una duración como '30m', '1h' o '7d' a segundos
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    match = re.fullmatch(r'(\d+)([smhd])', text.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError("La ventana debe tener el formato <número><s|m|h|d>, por ejemplo 1h")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+def min_window_seconds(check_interval_minutes):
+    """Duración mínima (segundos) de una ventana que puede llegar a dispararse"""
+    return check_interval_minutes * 60 * MIN_WINDOW_CHECKS
+
+
+def format_window(seconds):
+    """Convierte segundos a la duración más legible ('1h', '30m', ...)"""
+    for unit in ('d', 'h', 'm'):
+        if seconds % WINDOW_UNITS[unit] == 0:
+            return f"{seconds // WINDOW_UNITS[unit]}{unit}"
+    return f"{seconds}s"
+
+
+class RollingWindow:
+    """
+    Precios de un token en los últimos N segundos
+
+    Mantiene el primer valor, el mínimo y el máximo de la ventana con colas
+    monótonas, de modo que cada actualización cuesta O(1) amortizado.
+    """
+
+    def __init__(self, window_seconds, max_samples=MAX_SAMPLES):
+        """
+        Inicializa la ventana
+
+        Args:
+            window_seconds (int): Duración de la ventana en segundos
+            max_samples (int): Tamaño máximo del buffer de muestras
+        """
+        self.window_seconds = window_seconds
+        self._samples = deque(maxlen=max_samples)  # (timestamp, precio)
+        self._min = deque()  # Precios crecientes: el primero es el mínimo
+        self._max = deque()  # Precios decrecientes: el primero es el máximo
+
+    def push(self, price, timestamp=None):
+        """Añade un precio y descarta las muestras que han salido de la ventana"""
+        if timestamp is None:
+            timestamp = time.time()
+
+        self._samples.append((timestamp, price))
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((timestamp, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((timestamp, price))
+
+        self._expire(timestamp)
+
+    def _expire(self, now):
+        """Elimina las muestras anteriores al inicio de la ventana"""
+        cutoff = now - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        # Si el buffer ha descartado muestras por tamaño, la ventana empieza en la más antigua
+        if self._samples:
+            cutoff = max(cutoff, self._samples[0][0])
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def samples(self):
+        """Devuelve las muestras de la ventana como lista de (timestamp, precio)"""
+        return list(self._samples)
+
+    @property
+    def first(self):
+        """Precio más antiguo dentro de la ventana"""
+        return self._samples[0][1] if self._samples else None
+
+    @property
+    def last(self):
+        """Precio más reciente"""
+        return self._samples[-1][1] if self._samples else None
+
+    @property
+    def min(self):
+        """Precio mínimo dentro de la ventana"""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        """Precio máximo dentro de la ventana"""
+        return self._max[0][1] if self._max else None
+
+    def change_percent(self):
+        """Variación porcentual entre el primer y el último precio de la ventana"""
+        if not self._samples or not self.first:
+            return 0.0
+        return (self.last - self.first) / self.first * 100
+
+    def rise_percent(self):
+        """Subida porcentual del último precio respecto al mínimo de la ventana"""
+        if not self._samples or not self.min:
+            return 0.0
+        return (self.last - self.min) / self.min * 100
+
+    def drop_percent(self):
+        """Bajada porcentual del último precio respecto al máximo de la ventana"""
+        if not self._samples or not self.max:
+            return 0.0
+        return (self.max - self.last) / self.max * 100
+
+
+class WindowStore:
+    """Ventanas deslizantes por token y duración"""
+
+    def __init__(self):
+        self._windows = {}  # (token_name, window_seconds) -> RollingWindow
+
+    def update(self, token_name, price, window_lengths, timestamp=None):
+        """
+        Añade un precio a todas las ventanas del token que se necesitan
+
+        Args:
+            token_name (str): Nombre del token
+            price (float): Precio actual
+            window_lengths (iterable): Duraciones (segundos) usadas por las alertas del token
+            timestamp (float, optional): Momento del precio, por defecto ahora
+
+        Returns:
+            dict: Duración -> RollingWindow actualizada
+        """
+        windows = {}
+        for window_seconds in set(window_lengths):
+            key = (token_name, window_seconds)
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = RollingWindow(window_seconds)
+            window.push(price, timestamp)
+            windows[window_seconds] = window
+        return windows
+
+    def export(self):
+        """Devuelve las muestras de cada ventana como (token, segundos, [(timestamp, precio), ...])"""
+        return [(token_name, window_seconds, window.samples())
+                for (token_name, window_seconds), window in self._windows.items()]
+
+    def restore(self, windows):
+        """Reconstruye las ventanas a partir de lo devuelto por export()"""
+        for token_name, window_seconds, samples in windows:
+            window = RollingWindow(window_seconds)
+            for timestamp, price in samples:
+                window.push(price, timestamp)
+            self._windows[(token_name, window_seconds)] = window
+
+    def retain(self, keys):
+        """Descarta las ventanas que ya no usa ninguna alerta activa"""
+        keys = set(keys)
+        for key in list(self._windows):
+            if key not in keys:
+                del self._windows[key]
@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 import os
-import platform
-import psutil
+import html
+import asyncio
 import logging
-import requests
 import time
 from datetime import datetime
 from telegram import Update, BotCommand
 from telegram.ext import ContextTypes, Application
-from src.core.telegram_bot import TelegramBot
-from src.core.database import CryptoDatabase
+from src.core.database import CryptoDatabase, PRICE_ALERT_TYPES, WINDOW_ALERT_TYPES, EXPRESSION_ALERT_TYPE
+from src.core.evaluator import COINGECKO_PRICE_URL, evaluate_partition, window_keys, window_store
+from src.core.http_cache import get_http_client, sum_counters
+from src.core.config import get_config
+from src.core.profiling import profiler, profiled
+from src.core.scheduler import scheduler, interactive, chunked
+from src.core.windows import parse_window, format_window, min_window_seconds
+from src.core.metrics import BotMetrics
+from src.core.alert_io import ALERT_FIELDS, parse_alerts_document, write_alerts_csv, write_alerts_json
+from src.core.expressions import CompiledExpression, ExpressionError, ExpressionIndex, looks_like_expression
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -17,6 +24,59 @@ logger = logging.getLogger(__name__)
 # Variables globales para las instancias
 telegram_bot = None
 db = None
+worker_pool = None
+chart_cache = None
+metrics_sampler = None
+audit_log = None
+
+# Métricas internas del bot (duración de los ticks, colas, cachés)
+bot_metrics = BotMetrics()
+
+# Alertas compuestas compiladas, indexadas por los tokens de los que dependen
+expression_index = ExpressionIndex()
+
+# Estado que se guarda en la instantánea para arrancar en caliente:
+# último precio de cada token y momento del último aviso de cada alerta
+price_cache = {}     # token -> (precio, timestamp)
+trigger_state = {}   # id de alerta -> timestamp del último aviso
+state_restored = False
+
+# Indica si hay una verificación de alertas en curso
+tick_running = False
+
+# Etiquetas de los tipos de alerta en /list
+LIST_ALERT_LABELS = {
+    'above': "↑ Above",
+    'below': "↓ Below",
+    'up': "⇡ Up",
+    'down': "⇣ Down",
+    'move': "⇅ Move",
+    'expression': "ƒ Expr"
+}
+
+# Margen (segundos) al comparar con CRYPTO_NOTIFICATION_COOLDOWN, para que un tiempo de
+# espera igual al intervalo de verificación no descarte avisos por milisegundos
+COOLDOWN_TOLERANCE = 5
+
+# Los precios de una instantánea más antigua que estos intervalos de verificación se descartan
+SNAPSHOT_MAX_AGE_INTERVALS = 2
+
+# Segundos entre limpiezas del historial de precios y momento de la última
+HISTORY_PRUNE_INTERVAL = 3600
+last_history_prune = 0
+
+# Tamaño máximo de los documentos de /import y número de errores que se muestran
+IMPORT_MAX_BYTES = 1024 * 1024
+IMPORT_MAX_ERRORS_SHOWN = 10
+
+# Número de ejecuciones que perfila /profile sin argumentos
+PROFILE_DEFAULT_RUNS = 5
+
+# Nombre del trabajo de la tarea programada en la cola de trabajos (para reprogramarlo)
+CHECK_JOB_NAME = "check_alerts"
+
+# Segundos entre comprobaciones de si ha terminado la verificación en curso antes de cambiar el pool de workers
+WORKER_POOL_SWAP_POLL = 1
 
 # Variable global para almacenar el tiempo de inicio
 start_time = time.time()
@@ -27,11 +87,15 @@ async def ping_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     # Mantenemos la respuesta directa para comandos interactivos
     await update.message.reply_text('pong')
 
+@profiled
+@interactive
 async def system_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Devuelve información completa del sistema incluyendo uptime y fecha actual"""
-    global telegram_bot
-    if telegram_bot is None:
-        telegram_bot = TelegramBot()
+    # Los datos del sistema vienen de la última muestra del hilo de métricas
+    sampler = get_metrics_sampler()
+    sample = sampler.latest()
+    static_info = sampler.static_info
+    bot_stats = sample['bot']
     
     # Calcular uptime
     uptime_seconds = time.time() - start_time
@@ -52,15 +116,15 @@ async def system_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     # Obtener información del sistema
     system_info = {
-        'Sistema Operativo': platform.system() + ' ' + platform.release(),
-        'Versión de Python': platform.python_version(),
-        'CPU': platform.processor(),
-        'Uso de CPU': f"{psutil.cpu_percent()}%",
-        'Memoria RAM': f"{psutil.virtual_memory().percent}% usado ({psutil.virtual_memory().used // (1024**3):.1f}GB / {psutil.virtual_memory().total // (1024**3):.1f}GB)",
-        'Disco': f"{psutil.disk_usage('/').percent}% usado",
+        'Sistema Operativo': static_info['os'],
+        'Versión de Python': static_info['python'],
+        'CPU': static_info['cpu'],
+        'Uso de CPU': f"{sample['cpu_percent']}%",
+        'Memoria RAM': f"{sample['memory_percent']}% usado ({sample['memory_used'] // (1024**3):.1f}GB / {sample['memory_total'] // (1024**3):.1f}GB)",
+        'Disco': f"{sample['disk_percent']}% usado",
         'Uptime del Bot': uptime_str,
         'Fecha y Hora': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'Hostname': platform.node()
+        'Hostname': static_info['hostname']
     }
     
     # Crear mensaje con formato HTML
@@ -69,14 +133,28 @@ async def system_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         message += f"<b>{key}:</b> {value}\n"
     
     # Añadir información adicional de red
-    try:
-        # Obtener información de red
-        net_io = psutil.net_io_counters()
+    if 'net_bytes_sent' in sample:
         message += f"\n<b>Red:</b>\n"
-        message += f"• Bytes enviados: {net_io.bytes_sent // (1024**2):.1f} MB\n"
-        message += f"• Bytes recibidos: {net_io.bytes_recv // (1024**2):.1f} MB\n"
-    except:
-        pass
+        message += f"• Bytes enviados: {sample['net_bytes_sent'] // (1024**2):.1f} MB\n"
+        message += f"• Bytes recibidos: {sample['net_bytes_recv'] // (1024**2):.1f} MB\n"
+    
+    # Añadir métricas del bot
+    message += "\n<b>Bot:</b>\n"
+    message += f"• Verificaciones: {bot_stats['tick_count']}\n"
+    if bot_stats['last_tick_duration'] is not None:
+        message += f"• Última verificación: {bot_stats['last_tick_duration']:.2f}s (media {bot_stats['avg_tick_duration']:.2f}s)\n"
+    message += f"• Cola de actualizaciones: {format_metric(bot_stats.get('update_queue_depth'))}\n"
+    message += f"• Cola de workers: {format_metric(bot_stats.get('worker_queue_depth'))}\n"
+    message += (f"• Lotes en segundo plano: {format_metric(bot_stats.get('background_running'))} en curso, "
+                f"{format_metric(bot_stats.get('background_waiting'))} en espera\n")
+    message += f"• Caché de gráficas: {format_metric(bot_stats.get('chart_cache_hit_rate'), '%')}\n"
+    http_stats = bot_stats.get('http_cache') or {}
+    if http_stats.get('requests'):
+        http_hits = http_stats['fresh_hits'] + http_stats['not_modified']
+        message += (f"• Caché HTTP: {http_hits / http_stats['requests'] * 100:.1f}% "
+                    f"({http_stats['not_modified']} no modificadas, "
+                    f"{http_stats['bytes_saved'] / 1024:.1f} KB ahorrados)\n")
+    message += f"• Muestra tomada hace {int(time.time() - sample['timestamp'])}s\n"
     
     # Añadir información de alertas activas si está disponible
     try:
@@ -84,8 +162,7 @@ async def system_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         if db is None:
             db = CryptoDatabase()
         
-        active_alerts = db.get_active_alerts()
-        message += f"\n<b>Alertas Activas:</b> {len(active_alerts)}\n"
+        message += f"\n<b>Alertas Activas:</b> {db.count_active_alerts()}\n"
     except:
         message += f"\n<b>Alertas Activas:</b> No disponible\n"
     
@@ -94,112 +171,360 @@ async def system_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 
 
+# Función para formatear una métrica opcional
+def format_metric(value, suffix=''):
+    """Devuelve la métrica como texto, o 'N/A' si no está disponible"""
+    if value is None:
+        return "N/A"
+    if isinstance(value, float):
+        return f"{value:.1f}{suffix}"
+    return f"{value}{suffix}"
+
+# Función para obtener los contadores de la caché HTTP
+def http_cache_totals():
+    """Contadores de la caché HTTP del proceso principal y, en modo multiproceso, de los workers"""
+    totals = [get_http_client().totals()]
+    if worker_pool is not None:
+        totals.append(worker_pool.http_totals())
+    return sum_counters(totals)
+
+# Función para obtener el muestreador de métricas
+def get_metrics_sampler():
+    """Devuelve el muestreador de métricas, creándolo y arrancándolo la primera vez"""
+    global metrics_sampler
+    if metrics_sampler is None:
+        config = get_config()
+        from src.core.metrics import MetricsSampler, hit_rate
+        
+        bot_metrics.register_gauge(
+            'worker_queue_depth',
+            lambda: sum(worker_pool.queue_sizes()) if worker_pool is not None else 0)
+        bot_metrics.register_gauge(
+            'chart_cache_hit_rate',
+            lambda: hit_rate(chart_cache.hits, chart_cache.misses) if chart_cache is not None else None)
+        bot_metrics.register_gauge('http_cache', http_cache_totals)
+        bot_metrics.register_gauge('background_running', lambda: scheduler.background_running)
+        bot_metrics.register_gauge('background_waiting', lambda: scheduler.background_waiting)
+        
+        metrics_sampler = MetricsSampler(bot_metrics, config.crypto_metrics_interval, config.crypto_metrics_history)
+        metrics_sampler.start()
+    return metrics_sampler
+
 # Función para la tarea programada
+@profiled
 async def scheduled_task(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Envía un mensaje programado al chat y verifica alertas de precios"""
-    global telegram_bot, db
-    if telegram_bot is None:
-        telegram_bot = TelegramBot()
+    global tick_running
+    # No empezar una verificación mientras la anterior sigue en curso
+    if tick_running:
+        logger.warning("La verificación anterior sigue en curso; se omite esta ejecución")
+        return
+    tick_running = True
+    tick_start = time.perf_counter()
+    try:
+        await check_alerts()
+    finally:
+        tick_running = False
+        bot_metrics.record_tick(time.perf_counter() - tick_start)
+
+async def check_alerts() -> None:
+    """Comprueba las alertas activas y notifica las que se han disparado"""
+    global db
+    telegram_bot = get_telegram_bot()
     if db is None:
         db = CryptoDatabase()
     
-    # Obtener configuración desde variables de entorno
-    from src.bot import CRYPTO_DEFAULT_PRICE_SOURCE, CRYPTO_DEBUG_MODE
+    # Obtener la configuración actual (puede cambiar en caliente)
+    config = get_config()
+    
+    # En la primera verificación tras arrancar, recuperar el estado del último arranque
+    global state_restored
+    if not state_restored:
+        state_restored = True
+        try:
+            restore_state()
+        except Exception as e:
+            logger.error(f"Error al restaurar la instantánea de estado: {str(e)}")
+    
+    tick_time = time.time()
     
     # Usar la clase TelegramBot para enviar el mensaje sin formato HTML
-    if CRYPTO_DEBUG_MODE:
-        telegram_bot.send_message("🔔 Ejecución programada - Verificando alertas de precios", parse_mode=None)
+    if config.crypto_debug_mode:
+        await scheduler.run_background(telegram_bot.send_message, "🔔 Ejecución programada - Verificando alertas de precios", parse_mode=None)
     
     # 1. Obtener todas las alertas activas de la base de datos
     active_alerts = db.get_active_alerts()
     if not active_alerts:
-        if CRYPTO_DEBUG_MODE:
-            telegram_bot.send_message("ℹ️ No hay alertas activas configuradas.", parse_mode=None)
+        if config.crypto_debug_mode:
+            await scheduler.run_background(telegram_bot.send_message, "ℹ️ No hay alertas activas configuradas.", parse_mode=None)
         return
     
-    # 2. Agrupar alertas por token para hacer una sola petición por token
+    # 2. Agrupar alertas por token para hacer una sola petición por token.
+    #    Las alertas compuestas se compilan una sola vez y sus tokens se añaden a la consulta
     tokens = {}
+    expression_alerts = []
     for alert in active_alerts:
+        if alert['alert_type'] == EXPRESSION_ALERT_TYPE:
+            expression_alerts.append(alert)
+            continue
         token_name = alert['token_name']
         if token_name not in tokens:
             tokens[token_name] = []
-        tokens[token_name].append(alert)
+        tokens[token_name].append(dict(alert))
     
-    # 3. Hacer las peticiones a CoinGecko para obtener los precios actuales
-    token_prices = {}
-    triggered_alerts = []
+    expression_index.sync(expression_alerts)
+    for token_name in expression_index.tokens:
+        tokens.setdefault(token_name, [])
     
-    for token_name in tokens.keys():
+    # Mantener el estado de disparo solo de las alertas activas. Si no hay estado
+    # (primer arranque o sin instantánea), se parte de last_triggered de la base de datos
+    active_ids = {alert['id'] for alert in active_alerts}
+    for alert_id in list(trigger_state):
+        if alert_id not in active_ids:
+            del trigger_state[alert_id]
+    for alert in active_alerts:
+        if alert['id'] not in trigger_state and alert['last_triggered']:
+            try:
+                trigger_state[alert['id']] = datetime.strptime(alert['last_triggered'], '%Y-%m-%d %H:%M:%S').timestamp()
+            except ValueError:
+                pass
+    
+    # 3. Obtener los precios y comprobar las alertas en lotes que ceden el paso a los comandos
+    result = await evaluate_tokens(tokens, config)
+    
+    audit = get_audit_log()
+    for token_name, error in result['errors']:
+        audit.record('fetch_error', token_name=token_name, message=error)
+        await scheduler.run_background(telegram_bot.send_message, error, parse_mode=None)
+    
+    # Evaluar las alertas compuestas afectadas por los precios obtenidos
+    triggered_alerts = result['triggered']
+    for alert_id in expression_index.evaluate(result['prices']):
+        compiled = expression_index.get(alert_id)
+        triggered_alerts.append({
+            'id': alert_id,
+            'token_name': ','.join(sorted(compiled.tokens)),
+            'alert_type': EXPRESSION_ALERT_TYPE,
+            'expression': compiled.source,
+            'prices': {token: result['prices'].get(token) for token in sorted(compiled.tokens)}
+        })
+    
+    # Guardar los precios obtenidos en el historial (gráficas de /info) y en la caché de precios
+    if result['prices']:
+        db.add_price_history(result['prices'])
+        for token_name, price in result['prices'].items():
+            price_cache[token_name] = (price, tick_time)
+    
+    # Conservar solo los últimos CRYPTO_CLEANUP_DAYS días de historial
+    global last_history_prune
+    if tick_time - last_history_prune >= HISTORY_PRUNE_INTERVAL:
+        last_history_prune = tick_time
         try:
-            # Convertir el nombre del token a minúsculas para la API
-            token_id = token_name.lower()
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={token_id}&vs_currencies=usd"
-            response = requests.get(url)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if token_id in data and 'usd' in data[token_id]:
-                    current_price = data[token_id]['usd']
-                    token_prices[token_name] = current_price
-                    
-                    # 4. Comprobar si las alertas se encuentran above o below
-                    for alert in tokens[token_name]:
-                        alert_type = alert['alert_type']
-                        target_price = alert['target_price']
-                        alert_id = alert['id']
-                        
-                        # Verificar si se cumple la condición de la alerta
-                        if (alert_type == 'above' and current_price >= target_price) or \
-                           (alert_type == 'below' and current_price <= target_price):
-                            # Registrar que la alerta se ha disparado
-                            db.trigger_alert(alert_id)
-                            triggered_alerts.append({
-                                'id': alert_id,
-                                'token_name': token_name,
-                                'alert_type': alert_type,
-                                'target_price': target_price,
-                                'current_price': current_price
-                            })
-                else:
-                    telegram_bot.send_message(f"⚠️ No se encontró información de precio para {token_name}", parse_mode=None)
-            else:
-                telegram_bot.send_message(f"⚠️ Error al consultar precio de {token_name}: Código {response.status_code}", parse_mode=None)
+            deleted = db.prune_price_history(config.crypto_cleanup_days)
+            if deleted:
+                logger.info(f"Eliminados {deleted} precios del historial con más de {config.crypto_cleanup_days} días")
         except Exception as e:
-            telegram_bot.send_message(f"⚠️ Error al procesar {token_name}: {str(e)}", parse_mode=None)
+            logger.error(f"Error al limpiar el historial de precios: {str(e)}")
+    
+    # No volver a avisar de una alerta hasta que pase el tiempo de espera entre notificaciones
+    notified_alerts = []
+    for alert in triggered_alerts:
+        last_notified = trigger_state.get(alert['id'])
+        if last_notified is not None and tick_time - last_notified < config.crypto_notification_cooldown - COOLDOWN_TOLERANCE:
+            continue
+        trigger_state[alert['id']] = tick_time
+        notified_alerts.append(alert)
+    triggered_alerts = notified_alerts
+    
+    # 4. Registrar las alertas disparadas (solo el coordinador escribe en la base de datos)
+    for index, alert in enumerate(triggered_alerts, 1):
+        db.trigger_alert(alert['id'])
+        audit.record('trigger', **audit_trigger_fields(alert))
+        if index % config.crypto_eval_batch_size == 0:
+            await scheduler.yield_to_interactive()
+    
+    # Guardar la instantánea de estado para el próximo arranque
+    try:
+        save_state()
+    except Exception as e:
+        logger.error(f"Error al guardar la instantánea de estado: {str(e)}")
     
     # 5. Enviar reporte de alertas disparadas
     if triggered_alerts:
         report = "🚨 ALERTAS DISPARADAS 🚨\n\n"
         for alert in triggered_alerts:
-            condition = "por encima de" if alert['alert_type'] == 'above' else "por debajo de"
             report += f"ID: {alert['id']}\n"
             report += f"Token: {alert['token_name']}\n"
-            report += f"Condición: {condition} ${alert['target_price']}\n"
+            report += f"Condición: {describe_condition(alert)}\n"
+            if alert['alert_type'] == EXPRESSION_ALERT_TYPE:
+                prices = ", ".join(f"{token} ${price}" for token, price in alert['prices'].items())
+                report += f"Precios actuales: {prices}\n\n"
+                continue
+            if alert['change_percent'] is not None:
+                report += f"Variación en la ventana: {alert['change_percent']:+.2f}%\n"
             report += f"Precio actual: ${alert['current_price']}\n\n"
         
-        telegram_bot.send_message(report, parse_mode=None)
+        alert_ids = [alert['id'] for alert in triggered_alerts]
+        try:
+            await scheduler.run_background(telegram_bot.send_message, report, parse_mode=None)
+        except Exception as e:
+            audit.record('notification', alert_ids=alert_ids, ok=False, error=str(e))
+            raise
+        audit.record('notification', alert_ids=alert_ids, ok=True, length=len(report))
+    else:
+        if config.crypto_debug_mode:
+            await scheduler.run_background(telegram_bot.send_message, "✅ Verificación completada. No se dispararon alertas.", parse_mode=None)
+
+# Función para evaluar las alertas de todos los tokens
+async def evaluate_tokens(tokens, config):
+    """
+    Obtiene los precios y comprueba las alertas sin bloquear el bucle de eventos
+
+    En modo de un solo proceso los tokens se evalúan en lotes de CRYPTO_EVAL_BATCH_SIZE
+    en los hilos de segundo plano; en modo multiproceso los workers ya trabajan en
+    paralelo y solo se espera su resultado en un hilo.
+
+    Returns:
+        dict: Mismo formato que evaluate_partition
+    """
+    if config.crypto_workers > 1:
+        return await scheduler.run_background(get_worker_pool(config.crypto_workers).evaluate, tokens)
+    
+    batches = chunked(list(tokens.items()), config.crypto_eval_batch_size)
+    results = await asyncio.gather(*(
+        scheduler.run_background(evaluate_partition, dict(batch), retain=False) for batch in batches))
+    
+    # Las ventanas se liberan una sola vez, con los tokens de todos los lotes
+    window_store.retain(window_keys(tokens))
+    
+    merged = {'prices': {}, 'triggered': [], 'errors': []}
+    for result in results:
+        merged['prices'].update(result['prices'])
+        merged['triggered'].extend(result['triggered'])
+        merged['errors'].extend(result['errors'])
+    return merged
+
+# Función para obtener los datos de auditoría de una alerta disparada
+def audit_trigger_fields(alert):
+    """Devuelve los campos del evento 'trigger' de una alerta disparada"""
+    fields = {
+        'alert_id': alert['id'],
+        'token_name': alert['token_name'],
+        'alert_type': alert['alert_type']
+    }
+    if alert['alert_type'] == EXPRESSION_ALERT_TYPE:
+        fields['expression'] = alert['expression']
+        fields['prices'] = alert['prices']
+        return fields
+    fields['target_price'] = alert['target_price']
+    fields['current_price'] = alert['current_price']
+    if alert['alert_type'] in WINDOW_ALERT_TYPES:
+        fields['window_seconds'] = alert['window_seconds']
+        fields['change_percent'] = alert['change_percent']
+    return fields
+
+# Función para restaurar el estado guardado en una instantánea
+def restore_state():
+    """
+    Carga la instantánea de estado del último arranque
+
+    La instantánea se valida con la huella de las alertas activas: si no coincide,
+    solo se conserva el estado de las alertas que siguen activas. Los precios solo
+    se reutilizan si la instantánea es reciente.
+    """
+    config = get_config()
+    from src.core.snapshot import read_snapshot
+    
+    snapshot = read_snapshot()
+    if snapshot is None:
+        logger.info("No hay instantánea de estado; arranque en frío")
+        return
+    
+    if snapshot.fingerprint == db.get_alerts_fingerprint():
+        is_active = lambda alert_id: True
+    else:
+        active_ids = {alert['id'] for alert in db.iter_active_alerts()}
+        is_active = lambda alert_id: alert_id in active_ids
+        logger.warning("La instantánea no coincide con las alertas de la base de datos; "
+                       "solo se conserva el estado de las alertas que siguen activas")
+    
+    trigger_state.update({alert_id: timestamp for alert_id, timestamp in snapshot.triggers.items()
+                          if is_active(alert_id)})
+    # En modo multiproceso cada ventana se restaura en el worker responsable de su token
+    if config.crypto_workers > 1:
+        get_worker_pool(config.crypto_workers).restore_windows(snapshot.windows)
     else:
-        if CRYPTO_DEBUG_MODE:
-            telegram_bot.send_message("✅ Verificación completada. No se dispararon alertas.", parse_mode=None)
+        window_store.restore(snapshot.windows)
+    
+    # Los precios de una instantánea antigua ya no sirven como referencia
+    if snapshot.age <= config.crypto_check_interval * 60 * SNAPSHOT_MAX_AGE_INTERVALS:
+        price_cache.update(snapshot.prices)
+        expression_index.restore(
+            {alert_id: result for alert_id, result in snapshot.expressions.items() if is_active(alert_id)},
+            {token_name: price for token_name, (price, _) in snapshot.prices.items()})
+    else:
+        logger.info(f"Precios de la instantánea descartados (antigüedad {int(snapshot.age)}s)")
+    
+    logger.info(f"Instantánea de estado restaurada: {len(snapshot.prices)} precios, "
+                f"{len(snapshot.triggers)} alertas disparadas, {len(snapshot.windows)} ventanas")
+
+# Función para guardar el estado en una instantánea
+def save_state():
+    """Escribe la instantánea de estado junto a la base de datos"""
+    from src.core.snapshot import StateSnapshot, write_snapshot
+    
+    snapshot = StateSnapshot(
+        db.get_alerts_fingerprint(),
+        prices=price_cache,
+        triggers=trigger_state,
+        windows=worker_pool.export_windows() if worker_pool is not None else window_store.export(),
+        expressions=expression_index.export_results()
+    )
+    size = write_snapshot(snapshot)
+    logger.debug(f"Instantánea de estado guardada ({size} bytes)")
+
+# Función para describir la condición de una alerta
+def describe_condition(alert):
+    """Devuelve la condición de una alerta en texto legible"""
+    alert_type = alert['alert_type']
+    if alert_type == 'above':
+        return f"por encima de ${alert['target_price']}"
+    if alert_type == 'below':
+        return f"por debajo de ${alert['target_price']}"
+    if alert_type == EXPRESSION_ALERT_TYPE:
+        return alert['expression']
+    movement = {'up': 'subida', 'down': 'bajada', 'move': 'movimiento'}[alert_type]
+    return f"{movement} de {alert['target_price']}% en {format_window(alert['window_seconds'])}"
 
 # Función para crear una alerta
+@profiled
+@interactive
 async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Crea una alerta para un token a un precio objetivo"""
     global db
     if db is None:
         db = CryptoDatabase()
     
-    # Obtener configuración desde variables de entorno
-    from src.bot import CRYPTO_MAX_ALERTS_PER_TOKEN
+    # Obtener la configuración actual (puede cambiar en caliente)
+    config = get_config()
+    
+    # Las expresiones (ETH < 2500 AND BTC > 60000) se compilan y se guardan como alerta compuesta
+    expression_text = ' '.join(context.args or [])
+    if looks_like_expression(expression_text):
+        await create_expression_alert(update, expression_text)
+        return
     
     # Verificar que se proporcionaron los argumentos necesarios
     if not context.args or len(context.args) < 3:
         await update.message.reply_text(
             "❌ Error: Formato incorrecto.\n\n"
-            "Uso: /alert <token_name> <alert_type> <target_price> [token_contract]\n\n"
+            "Uso: /alert <token_name> <alert_type> <target_price> [token_contract]\n"
+            "Uso: /alert <token_name> <up|down|move> <porcentaje> <ventana>\n\n"
             "Ejemplo: /alert BTC above 50000\n"
             "Ejemplo: /alert ETH below 3000\n"
-            "Ejemplo: /alert PEPE above 0.000001 0x6982508145454ce325ddbe47a25d4ec3d2311933"
+            "Ejemplo: /alert PEPE above 0.000001 0x6982508145454ce325ddbe47a25d4ec3d2311933\n"
+            "Ejemplo: /alert BTC move 5% 4h\n"
+            "Ejemplo: /alert ETH < 2500 AND BTC > 60000"
         )
         return
     
@@ -208,15 +533,15 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     alert_type = context.args[1].lower()
     
     # Validar el tipo de alerta
-    if alert_type not in ['above', 'below']:
+    if alert_type not in PRICE_ALERT_TYPES + WINDOW_ALERT_TYPES:
         await update.message.reply_text(
-            "❌ Error: El tipo de alerta debe ser 'above' o 'below'."
+            "❌ Error: El tipo de alerta debe ser 'above', 'below', 'up', 'down' o 'move'."
         )
         return
     
-    # Validar y convertir el precio objetivo
+    # Validar y convertir el precio objetivo (o el porcentaje en las alertas de variación)
     try:
-        target_price = float(context.args[2])
+        target_price = float(context.args[2].rstrip('%'))
         if target_price <= 0:
             raise ValueError("El precio debe ser mayor que cero")
     except ValueError:
@@ -225,9 +550,25 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )
         return
     
-    # Verificar si se proporcionó un contrato de token (opcional)
     token_contract = None
-    if len(context.args) >= 4:
+    window_seconds = None
+    if alert_type in WINDOW_ALERT_TYPES:
+        # Las alertas de variación necesitan una ventana de tiempo (240m, 4h, 1d...)
+        try:
+            if len(context.args) < 4:
+                raise ValueError("Falta la ventana de tiempo, por ejemplo 4h")
+            window_seconds = parse_window(context.args[3])
+            # Con ventanas más cortas que dos verificaciones nunca habría dos precios que comparar
+            min_window = min_window_seconds(config.crypto_check_interval)
+            if window_seconds < min_window:
+                raise ValueError(
+                    f"La ventana debe ser de al menos {format_window(min_window)}, porque los precios "
+                    f"se consultan cada {config.crypto_check_interval} minutos")
+        except ValueError as e:
+            await update.message.reply_text(f"❌ Error: {str(e)}.")
+            return
+    elif len(context.args) >= 4:
+        # Verificar si se proporcionó un contrato de token (opcional)
         token_contract = context.args[3]
     
     
@@ -235,16 +576,16 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     token_alerts = db.get_alerts_by_token(token_name)
     active_alerts = [alert for alert in token_alerts if alert['is_active']]
     
-    if len(active_alerts) >= CRYPTO_MAX_ALERTS_PER_TOKEN:
+    if len(active_alerts) >= config.crypto_max_alerts_per_token:
         await update.message.reply_text(
             f"❌ Error: Ya tienes {len(active_alerts)} alertas activas para {token_name}. "  
-            f"El máximo permitido es {CRYPTO_MAX_ALERTS_PER_TOKEN}."
+            f"El máximo permitido es {config.crypto_max_alerts_per_token}."
         )
         return
     
     # Añadir la alerta a la base de datos
     try:
-        alert_id = db.add_alert(token_name, alert_type, target_price, token_contract)
+        alert_id = db.add_alert(token_name, alert_type, target_price, token_contract, window_seconds)
         
         # Mensaje de confirmación sin formato HTML
         confirmation = f"✅ Alerta creada:\n\n"
@@ -252,8 +593,11 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         confirmation += f"Token: {token_name}\n"
         if token_contract:
             confirmation += f"Contrato: {token_contract}\n"
-        confirmation += f"Tipo: {'Por encima de' if alert_type == 'above' else 'Por debajo de'}\n"
-        confirmation += f"Precio objetivo: {target_price}\n"
+        if alert_type in WINDOW_ALERT_TYPES:
+            confirmation += f"Condición: {describe_condition({'alert_type': alert_type, 'target_price': target_price, 'window_seconds': window_seconds})}\n"
+        else:
+            confirmation += f"Tipo: {'Por encima de' if alert_type == 'above' else 'Por debajo de'}\n"
+            confirmation += f"Precio objetivo: {target_price}\n"
         confirmation += f"Creada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
         await update.message.reply_text(confirmation)
@@ -265,6 +609,35 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             f"❌ Error: No se pudo crear la alerta. {error_str}"
         )
 
+# Función para crear una alerta compuesta
+async def create_expression_alert(update: Update, expression_text: str) -> None:
+    """Valida una expresión booleana sobre precios y la guarda como alerta"""
+    try:
+        compiled = CompiledExpression(expression_text)
+    except ExpressionError as e:
+        await update.message.reply_text(
+            f"❌ Error: Expresión no válida. {str(e)}\n\n"
+            "Ejemplo: /alert ETH < 2500 AND BTC > 60000"
+        )
+        return
+    
+    try:
+        alert_id = db.add_expression_alert(compiled.source, compiled.tokens)
+        
+        confirmation = "✅ Alerta compuesta creada:\n\n"
+        confirmation += f"ID: {alert_id}\n"
+        confirmation += f"Condición: {compiled.source}\n"
+        confirmation += f"Tokens: {', '.join(sorted(compiled.tokens))}\n"
+        confirmation += f"Creada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        
+        await update.message.reply_text(confirmation)
+    except Exception as e:
+        error_str = str(e)
+        logger.error(f"Error al crear alerta compuesta: {error_str}")
+        await update.message.reply_text(
+            f"❌ Error: No se pudo crear la alerta. {error_str}"
+        )
+
 async def post_init(application: Application) -> None:
     """Configura los comandos que aparecerán en el teclado de Telegram"""
     commands = [
@@ -272,13 +645,33 @@ async def post_init(application: Application) -> None:
         #BotCommand("system", "Muestra información completa del sistema"),
         BotCommand("list", "/l Muestra las alertas de precio programadas"),
         BotCommand("alert", "/a Crea una alerta de precio para un token"),
-        BotCommand("info", "/i Consulta el precio actual de un token"),
-        BotCommand("remove", "/r Elimina una alerta de precio por ID")
+        BotCommand("info", "/i Consulta el precio o la gráfica de un token"),
+        BotCommand("remove", "/r Elimina una alerta de precio por ID"),
+        BotCommand("import", "Importa alertas desde un archivo CSV o JSON"),
+        BotCommand("export", "Exporta las alertas activas a CSV o JSON")
     ]
     await application.bot.set_my_commands(commands)
     logger.info("Comandos de teclado configurados")
+    
+    # Arrancar el muestreo de métricas en segundo plano para /ping
+    bot_metrics.register_gauge('update_queue_depth', application.update_queue.qsize)
+    get_metrics_sampler()
+    
+    # Limitar los lotes de la tarea programada que se ejecutan a la vez
+    scheduler.resize(get_config().crypto_max_background)
+    
+    # Perfilar las primeras ejecuciones si así se ha configurado
+    profiler.reporter = send_profile_report
+    if get_config().crypto_profile_runs:
+        profiler.arm(get_config().crypto_profile_runs)
+    
+    # Registrar cuánto ha tardado el arranque hasta este punto
+    from src.core.startup import startup_profile
+    startup_profile.log_report()
 
 # Función para mostrar las alertas programadas
+@profiled
+@interactive
 async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Muestra las alertas de precio programadas en formato tabla con precios actuales"""
     global db
@@ -298,19 +691,22 @@ async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     # Agrupar alertas por token para hacer una sola petición por token
     tokens = {}
     for alert in active_alerts:
+        if alert['alert_type'] == EXPRESSION_ALERT_TYPE:
+            continue
         token_name = alert['token_name']
         if token_name not in tokens:
             tokens[token_name] = []
         tokens[token_name].append(alert)
     
     # Obtener precios actuales de todos los tokens únicos
+    http_client = get_http_client()
     token_prices = {}
     for token_name in tokens.keys():
         try:
             # Convertir el nombre del token a minúsculas para la API
             token_id = token_name.lower()
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={token_id}&vs_currencies=usd"
-            response = requests.get(url)
+            url = COINGECKO_PRICE_URL.format(token_id=token_id)
+            response = await scheduler.run_interactive(http_client.get, url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -335,8 +731,18 @@ async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         # Convertir los valores de sqlite3.Row a strings para evitar problemas de formato
         alert_id = str(alert['id'])
         token_name = str(alert['token_name'])
-        alert_type = "↑ Above" if str(alert['alert_type']) == 'above' else "↓ Below"
-        target_price = str(alert['target_price'])
+        alert_type = LIST_ALERT_LABELS[str(alert['alert_type'])]
+        if alert['alert_type'] == EXPRESSION_ALERT_TYPE:
+            # Las alertas compuestas muestran la expresión en lugar del token y el precio
+            # Las expresiones llevan <, > y &, que hay que escapar dentro del mensaje HTML
+            table_rows += html.escape(f"{alert_id}\t{alert_type}\t{alert['expression']}") + "\n"
+            continue
+        if alert['alert_type'] in WINDOW_ALERT_TYPES:
+            # Las alertas de variación muestran el porcentaje y la ventana en lugar del precio
+            alert_type += f" {format_window(alert['window_seconds'])}"
+            target_price = f"{alert['target_price']}%"
+        else:
+            target_price = f"{alert['target_price']}$"
         
         # Obtener precio actual del token
         current_price = token_prices.get(token_name, "N/A")
@@ -346,7 +752,7 @@ async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             current_price_str = str(current_price)
         
         # Añadir fila con tabs incluyendo el precio actual
-        table_rows += f"{alert_id}\t{token_name}\t{alert_type}\t{target_price}$\t [{current_price_str}$]\n"
+        table_rows += html.escape(f"{alert_id}\t{token_name}\t{alert_type}\t{target_price}\t [{current_price_str}$]") + "\n"
     
     # Crear mensaje completo
     message = "<pre>" + table_rows + "</pre>\n"
@@ -355,6 +761,8 @@ async def list_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await update.message.reply_text(message, parse_mode='HTML')
 
 # Función para eliminar una alerta
+@profiled
+@interactive
 async def remove_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Elimina una alerta de precio por ID"""
     global db
@@ -401,35 +809,434 @@ async def remove_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             f"❌ Error: No se pudo eliminar la alerta. {error_str}"
         )
 
+# Función para activar el perfilado
+@interactive
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Perfila las próximas N ejecuciones de la tarea programada y de los comandos (solo el chat de administración)"""
+    config = get_config()
+    if str(update.effective_chat.id) != str(config.telegram_chat_id):
+        await update.message.reply_text("❌ Error: Este comando solo está disponible en el chat de administración.")
+        return
+    
+    arg = context.args[0].lower() if context.args else str(PROFILE_DEFAULT_RUNS)
+    if arg == 'off':
+        runs = 0
+    else:
+        try:
+            runs = int(arg)
+        except ValueError:
+            runs = -1
+        if runs <= 0:
+            await update.message.reply_text(
+                "❌ Error: Formato incorrecto.\n\n"
+                "Uso: /profile [ejecuciones|off]\n\n"
+                f"Ejemplo: /profile {PROFILE_DEFAULT_RUNS}"
+            )
+            return
+    
+    profiler.arm(runs)
+    if runs:
+        await update.message.reply_text(
+            f"✅ Se perfilarán las próximas {runs} ejecuciones de la tarea programada y los comandos. "
+            f"Recibirás un resumen de cada una."
+        )
+    else:
+        await update.message.reply_text("✅ Perfilado desactivado.")
+
+# Función para enviar el resumen de un perfil al chat de administración
+async def send_profile_report(name, duration, path, summary):
+    """Envía al chat de administración las funciones más costosas de una ejecución perfilada"""
+    message = (f"⏱️ Perfil de {name}: {duration:.3f}s\n"
+               f"Guardado en {os.path.relpath(path)}\n"
+               f"Pendientes: {profiler.remaining}\n\n{summary}")
+    # Telegram limita los mensajes a 4096 caracteres
+    await scheduler.run_background(get_telegram_bot().send_message, message[:4096], parse_mode=None)
+
+# Función para importar alertas desde un documento
+@profiled
+@interactive
+async def import_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Importa alertas desde un documento CSV o JSON enviado con /import como pie o respondido con /import"""
+    global db
+    if db is None:
+        db = CryptoDatabase()
+    
+    # Obtener la configuración actual (puede cambiar en caliente)
+    config = get_config()
+    
+    # El documento puede venir en el propio mensaje o en el mensaje al que se responde
+    message = update.message
+    document = message.document
+    if document is None and message.reply_to_message is not None:
+        document = message.reply_to_message.document
+    
+    if document is None:
+        await message.reply_text(
+            "❌ Error: No se encontró ningún documento.\n\n"
+            "Envía un archivo CSV o JSON con /import como pie, o responde a un archivo con /import.\n\n"
+            f"Columnas: {', '.join(ALERT_FIELDS)}\n"
+            "Ejemplo CSV:\n"
+            "token_name,alert_type,target_price,token_contract,window,expression\n"
+            "BTC,above,70000,,,\n"
+            "ETH,move,5,,4h,\n"
+            ",expression,,,,ETH < 2500 AND BTC > 60000"
+        )
+        return
+    
+    if document.file_size and document.file_size > IMPORT_MAX_BYTES:
+        await message.reply_text(
+            f"❌ Error: El archivo es demasiado grande (máximo {IMPORT_MAX_BYTES // 1024} KB)."
+        )
+        return
+    
+    try:
+        telegram_file = await document.get_file()
+        data = await telegram_file.download_as_bytearray()
+        alerts, errors = parse_alerts_document(bytes(data), document.file_name or '',
+                                               min_window_seconds(config.crypto_check_interval))
+    except Exception as e:
+        error_str = str(e)
+        logger.error(f"Error al leer el documento de importación: {error_str}")
+        await message.reply_text(f"❌ Error: No se pudo leer el documento. {error_str}")
+        return
+    
+    # Si hay registros no válidos no se importa nada, para no dejar la importación a medias
+    if errors:
+        shown = "\n".join(errors[:IMPORT_MAX_ERRORS_SHOWN])
+        if len(errors) > IMPORT_MAX_ERRORS_SHOWN:
+            shown += f"\n... y {len(errors) - IMPORT_MAX_ERRORS_SHOWN} errores más"
+        await message.reply_text(f"❌ Error: El documento tiene registros no válidos. No se ha importado nada.\n\n{shown}")
+        return
+    
+    try:
+        inserted, rejected = db.add_alerts_bulk(alerts, config.crypto_max_alerts_per_token)
+    except Exception as e:
+        error_str = str(e)
+        logger.error(f"Error al importar alertas: {error_str}")
+        await message.reply_text(f"❌ Error: No se pudieron importar las alertas. {error_str}")
+        return
+    
+    summary = f"✅ Importación completada: {inserted} alertas añadidas."
+    if rejected:
+        tokens = sorted({alert['token_name'] for alert in rejected})
+        summary += (f"\n\n⚠️ {len(rejected)} alertas rechazadas por superar el máximo de "
+                    f"{config.crypto_max_alerts_per_token} alertas activas por token: {', '.join(tokens)}")
+    await message.reply_text(summary)
+
+# Función para exportar las alertas a un documento
+@profiled
+@interactive
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Envía las alertas activas como documento CSV (o JSON con /export json)"""
+    global db
+    if db is None:
+        db = CryptoDatabase()
+    
+    export_format = context.args[0].lower() if context.args else 'csv'
+    if export_format not in ('csv', 'json'):
+        await update.message.reply_text(
+            "❌ Error: Formato incorrecto.\n\n"
+            "Uso: /export [csv|json]"
+        )
+        return
+    
+    import tempfile
+    writer = write_alerts_json if export_format == 'json' else write_alerts_csv
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    export_path = None
+    try:
+        # Las filas se escriben una a una directamente desde el cursor
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', delete=False,
+                                         prefix=f"alertas-{timestamp}-", suffix=f".{export_format}") as export_file:
+            export_path = export_file.name
+            count = writer(db.iter_active_alerts(), export_file)
+        
+        if count == 0:
+            await update.message.reply_text(
+                "ℹ️ Información: No hay alertas de precio programadas."
+            )
+            return
+        
+        await scheduler.run_interactive(
+            get_telegram_bot().send_document,
+            export_path,
+            caption=f"📤 {count} alertas exportadas",
+            chat_id=str(update.effective_chat.id)
+        )
+    except Exception as e:
+        error_str = str(e)
+        logger.error(f"Error al exportar alertas: {error_str}")
+        await update.message.reply_text(
+            f"❌ Error: No se pudieron exportar las alertas. {error_str}"
+        )
+    finally:
+        if export_path is not None:
+            os.remove(export_path)
+
+# Función para obtener el pool de procesos worker (modo multiproceso)
+def get_worker_pool(num_workers):
+    """Devuelve el pool de workers, creándolo la primera vez que se necesita"""
+    global worker_pool
+    if worker_pool is None:
+        from src.core.cluster import WorkerPool
+        worker_pool = WorkerPool(num_workers)
+    return worker_pool
+
+async def post_shutdown(application: Application) -> None:
+    """Detiene los procesos worker, el pool de gráficas y el muestreo de métricas al parar el bot"""
+    global worker_pool, metrics_sampler, audit_log
+    if metrics_sampler is not None:
+        metrics_sampler.stop()
+        metrics_sampler = None
+    
+    if worker_pool is not None:
+        worker_pool.shutdown()
+        worker_pool = None
+    
+    from src.core.charts import shutdown_render_pool
+    shutdown_render_pool()
+    scheduler.shutdown()
+    
+    # Guardar el estado más reciente para el próximo arranque
+    if db is not None and state_restored:
+        try:
+            save_state()
+        except Exception as e:
+            logger.error(f"Error al guardar la instantánea de estado: {str(e)}")
+    
+    # Escribir los eventos de auditoría pendientes
+    if audit_log is not None:
+        audit_log.close()
+        audit_log = None
+
+# Función para aplicar los cambios del archivo de configuración
+async def reload_config_task(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comprueba si config.env ha cambiado y aplica la configuración nueva sin reiniciar"""
+    from src.core.config import reload_config_if_changed
+    changes = reload_config_if_changed()
+    if changes:
+        apply_config_changes(context.application, changes)
+
+def apply_config_changes(application: Application, changes: dict) -> None:
+    """
+    Ajusta las instancias en marcha a la configuración nueva
+
+    Los límites y tiempos de espera se leen con get_config() en cada uso, así que
+    solo hay que actualizar lo que guarda su propia copia de un valor.
+    """
+    global telegram_bot
+    config = get_config()
+    
+    # Reprogramar la tarea programada sin adelantar ni retrasar de más la siguiente ejecución
+    if 'crypto_check_interval' in changes:
+        interval = config.crypto_check_interval * 60
+        first = interval
+        old_jobs = application.job_queue.get_jobs_by_name(CHECK_JOB_NAME)
+        for job in old_jobs:
+            if job.next_t is not None:
+                first = min(first, max(0, (job.next_t - datetime.now(job.next_t.tzinfo)).total_seconds()))
+        # Crear la tarea nueva antes de quitar la anterior, para no quedarse sin ninguna si falla
+        application.job_queue.run_repeating(scheduled_task, interval=interval, first=first, name=CHECK_JOB_NAME)
+        for job in old_jobs:
+            job.schedule_removal()
+        logger.info(f"Tarea programada cada {config.crypto_check_interval} minutos")
+    
+    # El pool de workers se cambia cuando termine la verificación en curso
+    if 'crypto_workers' in changes:
+        application.create_task(replace_worker_pool())
+    
+    if 'crypto_chart_cache_mb' in changes and chart_cache is not None:
+        chart_cache.max_bytes = config.crypto_chart_cache_mb * 1024 * 1024
+        chart_cache.evict()
+    
+    if metrics_sampler is not None:
+        metrics_sampler.interval = config.crypto_metrics_interval
+        if 'crypto_metrics_history' in changes:
+            metrics_sampler.resize(config.crypto_metrics_history)
+    
+    if audit_log is not None:
+        audit_log.max_bytes = config.crypto_audit_max_mb * 1024 * 1024
+        audit_log.compress = config.crypto_audit_compress
+    
+    if 'crypto_max_background' in changes:
+        scheduler.resize(config.crypto_max_background)
+    
+    if 'crypto_profile_runs' in changes:
+        profiler.arm(config.crypto_profile_runs)
+    
+    # TelegramBot guarda su propia copia del chat y las opciones de envío
+    if any(name.startswith('telegram_') for name in changes):
+        telegram_bot = None
+        if 'telegram_bot_token' in changes:
+            logger.warning("El cambio de TELEGRAM_BOT_TOKEN solo se aplica a las notificaciones; "
+                           "los comandos seguirán usando el token anterior hasta reiniciar el bot")
+
+# Función para cambiar el número de procesos worker en caliente
+async def replace_worker_pool():
+    """
+    Sustituye el pool de workers por uno con el número de procesos de la configuración actual
+
+    Espera a que termine la verificación en curso, que sigue usando el pool anterior. El
+    nuevo pool arranca en la siguiente verificación con las ventanas repartidas según el
+    nuevo número de workers, y el anterior se detiene en un hilo para no bloquear el bucle.
+    """
+    global worker_pool
+    while tick_running:
+        await asyncio.sleep(WORKER_POOL_SWAP_POLL)
+    
+    config = get_config()
+    old_pool = worker_pool
+    worker_pool = None
+    if old_pool is not None:
+        windows = old_pool.export_windows()
+    else:
+        windows = window_store.export()
+        window_store.retain(())
+    if config.crypto_workers > 1:
+        get_worker_pool(config.crypto_workers).restore_windows(windows)
+    else:
+        window_store.restore(windows)
+    
+    if old_pool is not None:
+        await scheduler.run_background(old_pool.shutdown)
+
+# Función para obtener la instancia de TelegramBot
+def get_telegram_bot():
+    """Devuelve la instancia de TelegramBot, creándola la primera vez que se necesita"""
+    global telegram_bot
+    if telegram_bot is None:
+        # Importación diferida: TelegramBot carga requests
+        from src.core.telegram_bot import TelegramBot
+        telegram_bot = TelegramBot()
+    return telegram_bot
+
 # Función para inicializar las instancias globales
 def init_telegram_bot():
-    """Inicializa las instancias globales del bot de Telegram y la base de datos"""
-    global telegram_bot, db
-    telegram_bot = TelegramBot()
-    db = CryptoDatabase()
-    logger.info("Instancias de TelegramBot y CryptoDatabase inicializadas")
-    return telegram_bot
+    """
+    Valida la configuración de Telegram sin crear todavía las instancias globales
+
+    TelegramBot y CryptoDatabase se crean la primera vez que los usa un manejador
+    o la tarea programada, para que el bot empiece a hacer polling cuanto antes.
+    """
+    get_config().validate_telegram()
+    logger.info("Configuración de Telegram validada")
+
+# Función para obtener la caché de gráficas
+def get_chart_cache():
+    """Devuelve la caché de gráficas, creándola la primera vez que se necesita"""
+    global chart_cache
+    if chart_cache is None:
+        config = get_config()
+        from src.core.charts import ChartCache
+        chart_cache = ChartCache(max_bytes=config.crypto_chart_cache_mb * 1024 * 1024)
+    return chart_cache
+
+# Función para obtener el registro de auditoría
+def get_audit_log():
+    """Devuelve el registro de auditoría, creándolo y arrancándolo la primera vez"""
+    global audit_log
+    if audit_log is None:
+        config = get_config()
+        from src.core.audit import AuditLog
+        audit_log = AuditLog(max_bytes=config.crypto_audit_max_mb * 1024 * 1024, compress=config.crypto_audit_compress)
+        audit_log.start()
+    return audit_log
+
+# Función para enviar la gráfica de precios de un token
+async def send_price_chart(update: Update, token_id: str, range_text: str) -> None:
+    """Envía la gráfica del historial de precios de un token en el rango indicado"""
+    global db
+    if db is None:
+        db = CryptoDatabase()
+    
+    try:
+        range_seconds = parse_window(range_text)
+    except ValueError as e:
+        await update.message.reply_text(f"❌ Error: Rango no válido. {str(e)}.")
+        return
+    
+    token_name = token_id.upper()
+    range_text = format_window(range_seconds)
+    history = db.get_price_history(token_name, range_seconds)
+    if len(history) < 2:
+        await update.message.reply_text(
+            f"ℹ️ Información: No hay suficiente historial de precios de {token_name} en el rango {range_text}."
+        )
+        return
+    
+    # La gráfica solo cambia cuando llega un precio nuevo
+    last_timestamp = history[-1]['timestamp']
+    cache = get_chart_cache()
+    caption = f"📈 {token_name} ({range_text}) - último precio: ${history[-1]['price']}"
+    
+    try:
+        # Reenviar la imagen ya subida a Telegram si es posible
+        file_id = cache.get_file_id(token_name, range_text, last_timestamp)
+        if file_id:
+            try:
+                await update.message.reply_photo(photo=file_id, caption=caption)
+                cache.count_hit()
+                return
+            except Exception as e:
+                logger.warning(f"No se pudo reutilizar el file_id de la gráfica: {str(e)}")
+                cache.forget_file_id(token_name, range_text, last_timestamp)
+        
+        chart_path = cache.get(token_name, range_text, last_timestamp)
+        rendered = chart_path is None
+        if rendered:
+            # Dibujar en un proceso aparte para no bloquear el bucle de eventos
+            from src.core.charts import get_render_pool, render_chart
+            chart_path = cache.path_for(token_name, range_text, last_timestamp)
+            points = [(row['timestamp'], row['price']) for row in history]
+            await asyncio.get_running_loop().run_in_executor(
+                get_render_pool(), render_chart, points, f"{token_name} ({range_text})", str(chart_path))
+        
+        with open(chart_path, 'rb') as photo:
+            message = await update.message.reply_photo(photo=photo, caption=caption)
+        cache.set_file_id(token_name, range_text, last_timestamp, message.photo[-1].file_id)
+        
+        # Limpiar después de enviar, para no borrar la gráfica recién dibujada si supera el tamaño máximo
+        if rendered:
+            cache.evict()
+    except ImportError:
+        await update.message.reply_text(
+            "❌ Error: Las gráficas necesitan matplotlib (pip install -r requirements.txt)."
+        )
+    except Exception as e:
+        error_str = str(e)
+        logger.error(f"Error al generar la gráfica de {token_name}: {error_str}")
+        await update.message.reply_text(
+            f"❌ Error: No se pudo generar la gráfica. {error_str}"
+        )
 
 # Función para consultar el precio de un token
+@profiled
+@interactive
 async def tokenprice_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Consulta el precio actual de un token usando la API de CoinGecko"""
     # Verificar que se proporcionó un token
-    if not context.args or len(context.args) != 1:
+    if not context.args or len(context.args) > 2:
         await update.message.reply_text(
             "❌ Error: Formato incorrecto.\n\n"
-            "Uso: /info <token_name>\n\n"
+            "Uso: /info <token_name> [rango]\n\n"
             "Ejemplo: /info bitcoin\n"
-            "Ejemplo: /info ethereum"
+            "Ejemplo: /info ethereum\n"
+            "Ejemplo: /info bitcoin 24h"
         )
         return
     
     # Extraer el nombre del token
     token_id = context.args[0].lower()
     
+    # Con un rango se envía la gráfica del historial de precios
+    if len(context.args) == 2:
+        await send_price_chart(update, token_id, context.args[1])
+        return
+    
     try:
-        # Hacer la petición a la API de CoinGecko
-        url = f"https://api.coingecko.com/api/v3/simple/price?ids={token_id}&vs_currencies=usd"
-        response = requests.get(url)
+        # Hacer la petición a la API de CoinGecko (con caché condicional)
+        url = COINGECKO_PRICE_URL.format(token_id=token_id)
+        response = await scheduler.run_interactive(get_http_client().get, url)
         
         # Verificar si la respuesta es exitosa
         if response.status_code == 200:
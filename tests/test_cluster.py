@@ -0,0 +1,61 @@
+"""Pruebas del reparto de tokens entre workers (src/core/cluster.py)"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.core.cluster import HashRing, WorkerPool
+
+TOKENS = [f"TOKEN{i}" for i in range(1000)]
+
+
+def test_partition_covers_every_key_once():
+    partitions = HashRing(range(4)).partition(TOKENS)
+    assert sorted(key for keys in partitions.values() for key in keys) == sorted(TOKENS)
+    assert set(partitions) == {0, 1, 2, 3}
+
+
+def test_partition_is_stable_between_instances():
+    assert HashRing(range(4)).partition(TOKENS) == HashRing(range(4)).partition(TOKENS)
+
+
+def test_partition_is_stable_between_processes():
+    # hash() de Python cambia con PYTHONHASHSEED; el anillo no debe depender de él
+    code = ("from src.core.cluster import HashRing; "
+            "print([HashRing(range(4)).get_node(f'TOKEN{i}') for i in range(100)])")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = {
+        subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True,
+                       env={**os.environ, 'PYTHONHASHSEED': seed}).stdout
+        for seed in ('1', '2')
+    }
+    assert len(outputs) == 1
+
+
+def test_partition_is_balanced():
+    sizes = [len(keys) for keys in HashRing(range(4)).partition(TOKENS).values()]
+    assert min(sizes) > len(TOKENS) / 4 * 0.6
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    before = HashRing(range(4))
+    after = HashRing(range(5))
+    moved = [key for key in TOKENS if before.get_node(key) != after.get_node(key)]
+    assert all(after.get_node(key) == 4 for key in moved)
+    assert len(moved) < len(TOKENS) / 3
+
+
+def test_empty_ring_raises():
+    with pytest.raises(ValueError):
+        HashRing([]).get_node('BTC')
+
+
+def test_restored_windows_go_to_the_owning_worker():
+    pool = WorkerPool(3)
+    windows = [(token, 3600, [(1.0, 2.0)]) for token in TOKENS[:50]]
+    pool.restore_windows(windows)
+    for worker_id, worker_windows in pool._windows.items():
+        assert all(pool.ring.get_node(token) == worker_id for token, _, _ in worker_windows)
+    assert sorted(pool.export_windows()) == sorted(windows)
@@ -0,0 +1,94 @@
+"""Pruebas de las alertas compuestas (src/core/expressions.py)"""
+
+import pytest
+
+from src.core.expressions import CompiledExpression, ExpressionError, ExpressionIndex
+
+
+def test_compiled_expression_normalizes_source_and_tokens():
+    compiled = CompiledExpression("eth < 2500 and (btc>60000 or not sol >= 100.50)")
+    assert compiled.source == "ETH < 2500 AND ( BTC > 60000 OR NOT SOL >= 100.5 )"
+    assert compiled.tokens == {'ETH', 'BTC', 'SOL'}
+    # La expresión normalizada se puede volver a analizar
+    assert CompiledExpression(compiled.source).source == compiled.source
+
+
+def test_compiled_expression_operator_precedence():
+    # AND tiene más prioridad que OR
+    compiled = CompiledExpression("A > 1 OR B > 1 AND C > 1")
+    assert compiled.evaluate({'A': 2, 'B': 0, 'C': 0}) is True
+    assert compiled.evaluate({'A': 0, 'B': 2, 'C': 0}) is False
+    assert compiled.evaluate({'A': 0, 'B': 2, 'C': 2}) is True
+
+
+def test_compiled_expression_missing_price_returns_none():
+    compiled = CompiledExpression("ETH < 2500 AND BTC > 60000")
+    assert compiled.evaluate({'ETH': 2000}) is None
+
+
+def test_token_names_may_start_with_digits():
+    compiled = CompiledExpression("1INCH > 0.5 AND BTC < 60000")
+    assert compiled.tokens == {'1INCH', 'BTC'}
+    assert compiled.evaluate({'1INCH': 1, 'BTC': 50000}) is True
+
+
+@pytest.mark.parametrize('source', [
+    "",
+    "ETH",
+    "ETH <",
+    "ETH < 2500 AND",
+    "(ETH < 2500",
+    "ETH < 2500)",
+    "1 < 2",
+    "ETH < 25$",
+    "BTC > 1.5x",
+])
+def test_invalid_expressions_raise(source):
+    with pytest.raises(ExpressionError):
+        CompiledExpression(source)
+
+
+def _index(*expressions):
+    index = ExpressionIndex()
+    index.sync([{'id': alert_id, 'expression': source}
+                for alert_id, source in enumerate(expressions, start=1)])
+    return index
+
+
+def test_index_only_reports_true_expressions():
+    index = _index("ETH < 2500", "BTC > 60000")
+    assert index.evaluate({'ETH': 2000, 'BTC': 50000}) == [1]
+    assert index.tokens == {'ETH', 'BTC'}
+
+
+def test_index_keeps_reporting_while_condition_holds():
+    index = _index("ETH < 2500")
+    assert index.evaluate({'ETH': 2000}) == [1]
+    # El precio no cambia: se reutiliza el resultado sin volver a evaluar
+    assert index.evaluate({'ETH': 2000}) == [1]
+    assert index.evaluate({'ETH': 3000}) == []
+
+
+def test_index_ignores_stale_prices():
+    index = _index("ETH < 2500 AND BTC > 60000")
+    assert index.evaluate({'ETH': 2000, 'BTC': 70000}) == [1]
+    # Falla la consulta de BTC: la alerta no se dispara con su precio anterior
+    assert index.evaluate({'ETH': 2000}) == []
+    # Ni se reutiliza el resultado anterior cuando BTC vuelve con otro precio
+    assert index.evaluate({'ETH': 2000, 'BTC': 50000}) == []
+    assert index.evaluate({'ETH': 2000, 'BTC': 70000}) == [1]
+
+
+def test_index_sync_removes_inactive_alerts():
+    index = _index("ETH < 2500", "BTC > 60000")
+    index.sync([{'id': 2, 'expression': "BTC > 60000"}])
+    assert index.get(1) is None
+    assert index.tokens == {'BTC'}
+    assert index.evaluate({'ETH': 2000, 'BTC': 70000}) == [2]
+
+
+def test_index_restore_reuses_saved_results():
+    index = _index("ETH < 2500")
+    index.restore({1: True}, {'ETH': 2000})
+    assert index.export_results() == {1: True}
+    assert index.evaluate({'ETH': 2000}) == [1]
@@ -0,0 +1,79 @@
+"""Pruebas de la instantánea de estado (src/core/snapshot.py)"""
+
+import zlib
+
+import pytest
+
+from src.core.snapshot import (StateSnapshot, SnapshotError, _CRC, _decode, _encode,
+                               read_snapshot, write_snapshot)
+
+
+def _snapshot():
+    return StateSnapshot(
+        (3, 12, 25),
+        prices={'BTC': (65000.5, 1700000000.0), 'ÑANDÚ': (0.25, 1700000060.0)},
+        triggers={4: 1700000100.0, 9: 1700000200.0},
+        windows=[('BTC', 3600, [(1700000000.0, 64000.0), (1700000060.0, 65000.5)]),
+                 ('ETH', 7200, [])],
+        expressions={7: True, 8: False},
+        created_at=1700000300.0
+    )
+
+
+def _with_crc(body):
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def test_round_trip():
+    original = _snapshot()
+    decoded = _decode(_encode(original))
+    assert decoded.fingerprint == original.fingerprint
+    assert decoded.prices == original.prices
+    assert decoded.triggers == original.triggers
+    assert decoded.windows == original.windows
+    assert decoded.expressions == original.expressions
+    assert decoded.created_at == original.created_at
+
+
+def test_round_trip_empty():
+    decoded = _decode(_encode(StateSnapshot((0, 0, 0), created_at=1.0)))
+    assert (decoded.prices, decoded.triggers, decoded.windows, decoded.expressions) == ({}, {}, [], {})
+
+
+def test_crc_mismatch_is_rejected():
+    data = bytearray(_encode(_snapshot()))
+    data[20] ^= 0xFF
+    with pytest.raises(SnapshotError, match="CRC"):
+        _decode(bytes(data))
+
+
+@pytest.mark.parametrize('length', [0, 10, 40])
+def test_truncated_data_is_rejected(length):
+    with pytest.raises(SnapshotError):
+        _decode(_encode(_snapshot())[:length])
+
+
+def test_truncated_body_with_valid_crc_is_rejected():
+    body = _encode(_snapshot())[:-_CRC.size]
+    with pytest.raises(SnapshotError, match="truncada"):
+        _decode(_with_crc(body[:-5]))
+
+
+def test_unknown_format_is_rejected():
+    body = b'XXXX' + _encode(_snapshot())[4:-_CRC.size]
+    with pytest.raises(SnapshotError, match="desconocido"):
+        _decode(_with_crc(body))
+
+
+def test_write_and_read(tmp_path):
+    path = tmp_path / 'state.snapshot'
+    size = write_snapshot(_snapshot(), path)
+    assert size == path.stat().st_size
+    assert read_snapshot(path).windows == _snapshot().windows
+
+
+def test_read_missing_or_damaged_returns_none(tmp_path):
+    path = tmp_path / 'state.snapshot'
+    assert read_snapshot(path) is None
+    path.write_bytes(_encode(_snapshot())[:-1])
+    assert read_snapshot(path) is None
@@ -0,0 +1,85 @@
+"""Pruebas de las ventanas deslizantes de precios (src/core/windows.py)"""
+
+import random
+
+import pytest
+
+from src.core.windows import (RollingWindow, WindowStore, format_window, min_window_seconds,
+                              parse_window)
+
+
+@pytest.mark.parametrize('text, seconds', [('30s', 30), ('15m', 900), ('4h', 14400), ('7D', 604800)])
+def test_parse_and_format_window(text, seconds):
+    assert parse_window(text) == seconds
+    assert format_window(seconds) == text.lower()
+
+
+@pytest.mark.parametrize('text', ['', '0h', '5', 'h', '1w', '-1h', '1.5h'])
+def test_parse_window_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_window(text)
+
+
+def test_min_window_seconds():
+    assert min_window_seconds(60) == 7200
+
+
+def test_min_max_and_percentages():
+    window = RollingWindow(100)
+    for timestamp, price in enumerate([10, 12, 8, 9]):
+        window.push(price, timestamp)
+    assert (window.first, window.last, window.min, window.max) == (10, 9, 8, 12)
+    assert window.change_percent() == pytest.approx(-10)
+    assert window.rise_percent() == pytest.approx(12.5)
+    assert window.drop_percent() == pytest.approx(25)
+
+
+def test_expired_samples_leave_the_window():
+    window = RollingWindow(10)
+    window.push(5, 0)
+    window.push(20, 5)
+    window.push(10, 12)
+    # La muestra de t=0 ha salido de la ventana [2, 12]
+    assert window.samples() == [(5, 20), (12, 10)]
+    assert (window.min, window.max) == (10, 20)
+    window.push(11, 16)
+    # Y la de t=5, máximo hasta ahora, sale de [6, 16]
+    assert (window.first, window.min, window.max) == (10, 10, 11)
+
+
+def test_min_max_match_brute_force():
+    rng = random.Random(1)
+    window = RollingWindow(50)
+    history = []
+    for timestamp in range(500):
+        price = rng.uniform(1, 100)
+        history.append((timestamp, price))
+        window.push(price, timestamp)
+        inside = [price for sample_time, price in history if sample_time >= timestamp - 50]
+        assert (window.min, window.max) == (min(inside), max(inside))
+
+
+def test_buffer_limit_moves_window_start():
+    window = RollingWindow(1000, max_samples=3)
+    for timestamp, price in enumerate([1, 50, 2, 3]):
+        window.push(price, timestamp)
+    # El buffer descarta el precio 1: el mínimo pasa a ser 2
+    assert len(window) == 3
+    assert (window.first, window.min, window.max) == (50, 2, 50)
+
+
+def test_empty_window():
+    window = RollingWindow(60)
+    assert (window.first, window.last, window.min, window.max) == (None, None, None, None)
+    assert window.change_percent() == 0.0
+
+
+def test_store_export_restore_and_retain():
+    store = WindowStore()
+    store.update('BTC', 100, [60, 3600], timestamp=0)
+    store.update('BTC', 110, [60, 3600], timestamp=30)
+    restored = WindowStore()
+    restored.restore(store.export())
+    assert sorted(restored.export()) == sorted(store.export())
+    restored.retain({('BTC', 3600)})
+    assert [(token, seconds) for token, seconds, _ in restored.export()] == [('BTC', 3600)]